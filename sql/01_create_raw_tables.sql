@@ -103,4 +103,10 @@ CREATE OR REPLACE TABLE TRANS (
     K_SYMBOL        VARCHAR,
     BANK            VARCHAR,
     ACCOUNT         VARCHAR
-)
+);
+
+-- TRANS_INCOMING: staging area for one streaming micro-batch (src/load/stream_ingest.py)
+-- Same columns as TRANS plus LOAD_SEQ (row order within the batch), truncated before every batch
+CREATE TABLE IF NOT EXISTS TRANS_INCOMING LIKE TRANS;
+
+ALTER TABLE TRANS_INCOMING ADD COLUMN IF NOT EXISTS LOAD_SEQ NUMBER
@@ -61,6 +61,8 @@ CREATE OR REPLACE TABLE DIM_DISTRICT (
 );
 
 -- Fact: Transactions (the core event table — GRAIN: one row per transaction)
+-- No CLUSTER BY: 03_transform_raw_to_analytics.sql inserts rows in date order,
+-- which clusters it naturally (see src/perf/ordering_report.py)
 CREATE OR REPLACE TABLE FCT_TRANSACTIONS (
     TRANSACTION_KEY INT         NOT NULL PRIMARY KEY,
     ACCOUNT_KEY     INT         NOT NULL,
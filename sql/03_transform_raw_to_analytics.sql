@@ -85,6 +85,8 @@ FROM FINFLOW.RAW.DISTRICT d
 WHERE TRY_TO_NUMBER(d.A1) IS NOT NULL;
 
 -- Populate FCT_TRANSACTIONS
+-- Inserted in (date, account) order so micro-partitions come out naturally
+-- clustered by date, without an automatic clustering key to maintain
 TRUNCATE TABLE FINFLOW.ANALYTICS.FCT_TRANSACTIONS;
 
 INSERT INTO FINFLOW.ANALYTICS.FCT_TRANSACTIONS (
@@ -102,3 +104,6 @@ SELECT
     TRIM(t.K_SYMBOL)                                          AS K_SYMBOL
 FROM FINFLOW.RAW.TRANS t
 WHERE TRY_TO_NUMBER(t.TRANS_ID) IS NOT NULL
+  AND TRY_TO_NUMBER(t.ACCOUNT_ID) IS NOT NULL
+  AND TRY_TO_DATE(LPAD(t.DATE, 6, '0'), 'YYMMDD') IS NOT NULL
+ORDER BY TRANSACTION_DATE, ACCOUNT_KEY
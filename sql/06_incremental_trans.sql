@@ -0,0 +1,79 @@
+-- 06_incremental_trans.sql
+-- Applies one micro-batch of new transactions (already in RAW.TRANS_INCOMING)
+-- to RAW.TRANS and the ANALYTICS tables it affects.
+--
+-- HIGH-LEVEL EXPLANATION:
+--   The full transform (03) truncates and rebuilds everything. For streaming
+--   ingestion we only touch the rows in the batch:
+--     1. Upsert the batch into RAW.TRANS (a re-delivered TRANS_ID replaces
+--        the earlier copy, so re-delivering a file is harmless and a
+--        corrected file wins)
+--     2. Add any new dates to DIM_DATE
+--     3. Upsert the batch into FCT_TRANSACTIONS the same way
+--   RAW and FCT both upsert, so a later full rebuild (03) from RAW.TRANS
+--   reproduces what the stream wrote.
+--   The casting/cleaning logic MUST match 03_transform_raw_to_analytics.sql.
+--   A batch can hold the same TRANS_ID twice (a file re-delivered before the
+--   first copy was loaded), so every MERGE source keeps one row per key —
+--   otherwise both copies are inserted, or the UPDATE matches several rows
+--   and Snowflake rejects the MERGE as nondeterministic. LOAD_SEQ is the
+--   row's position in the batch (files in arrival order), so both MERGEs
+--   keep the same, most recently delivered copy.
+--   src/load/stream_ingest.py runs this file inside BEGIN ... COMMIT.
+
+MERGE INTO FINFLOW.RAW.TRANS t
+USING (
+    SELECT *
+    FROM FINFLOW.RAW.TRANS_INCOMING
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY TRANS_ID ORDER BY LOAD_SEQ DESC) = 1
+) i
+    ON t.TRANS_ID = i.TRANS_ID
+WHEN MATCHED THEN UPDATE SET
+    ACCOUNT_ID = i.ACCOUNT_ID, DATE = i.DATE, TYPE = i.TYPE, OPERATION = i.OPERATION,
+    AMOUNT = i.AMOUNT, BALANCE = i.BALANCE, K_SYMBOL = i.K_SYMBOL, BANK = i.BANK, ACCOUNT = i.ACCOUNT
+WHEN NOT MATCHED THEN INSERT (
+    TRANS_ID, ACCOUNT_ID, DATE, TYPE, OPERATION, AMOUNT, BALANCE, K_SYMBOL, BANK, ACCOUNT
+) VALUES (
+    i.TRANS_ID, i.ACCOUNT_ID, i.DATE, i.TYPE, i.OPERATION, i.AMOUNT, i.BALANCE, i.K_SYMBOL, i.BANK, i.ACCOUNT
+);
+
+MERGE INTO FINFLOW.ANALYTICS.DIM_DATE d
+USING (
+    SELECT DISTINCT TRY_TO_DATE(LPAD(i.DATE, 6, '0'), 'YYMMDD') AS DATE_KEY
+    FROM FINFLOW.RAW.TRANS_INCOMING i
+    WHERE TRY_TO_DATE(LPAD(i.DATE, 6, '0'), 'YYMMDD') IS NOT NULL
+) n
+    ON d.DATE_KEY = n.DATE_KEY
+WHEN NOT MATCHED THEN INSERT (DATE_KEY, YEAR, MONTH, DAY, DAY_OF_WEEK, MONTH_NAME, QUARTER)
+VALUES (
+    n.DATE_KEY, YEAR(n.DATE_KEY), MONTH(n.DATE_KEY), DAY(n.DATE_KEY),
+    DAYOFWEEK(n.DATE_KEY), MONTHNAME(n.DATE_KEY), QUARTER(n.DATE_KEY)
+);
+
+MERGE INTO FINFLOW.ANALYTICS.FCT_TRANSACTIONS f
+USING (
+    SELECT
+        TRY_TO_NUMBER(i.TRANS_ID)                                AS TRANSACTION_KEY,
+        TRY_TO_NUMBER(i.ACCOUNT_ID)                              AS ACCOUNT_KEY,
+        TRY_TO_DATE(LPAD(i.DATE, 6, '0'), 'YYMMDD')              AS TRANSACTION_DATE,
+        TRIM(i.TYPE)                                              AS TYPE,
+        TRIM(i.OPERATION)                                         AS OPERATION,
+        TRY_TO_DECIMAL(i.AMOUNT, 12, 2)                           AS AMOUNT,
+        TRY_TO_DECIMAL(i.BALANCE, 12, 2)                          AS BALANCE,
+        TRIM(i.K_SYMBOL)                                          AS K_SYMBOL
+    FROM FINFLOW.RAW.TRANS_INCOMING i
+    WHERE TRY_TO_NUMBER(i.TRANS_ID) IS NOT NULL
+      AND TRY_TO_NUMBER(i.ACCOUNT_ID) IS NOT NULL
+      AND TRY_TO_DATE(LPAD(i.DATE, 6, '0'), 'YYMMDD') IS NOT NULL
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY TRANSACTION_KEY ORDER BY i.LOAD_SEQ DESC) = 1
+) n
+    ON f.TRANSACTION_KEY = n.TRANSACTION_KEY
+WHEN MATCHED THEN UPDATE SET
+    ACCOUNT_KEY = n.ACCOUNT_KEY, TRANSACTION_DATE = n.TRANSACTION_DATE, TYPE = n.TYPE,
+    OPERATION = n.OPERATION, AMOUNT = n.AMOUNT, BALANCE = n.BALANCE, K_SYMBOL = n.K_SYMBOL
+WHEN NOT MATCHED THEN INSERT (
+    TRANSACTION_KEY, ACCOUNT_KEY, TRANSACTION_DATE, TYPE, OPERATION, AMOUNT, BALANCE, K_SYMBOL
+) VALUES (
+    n.TRANSACTION_KEY, n.ACCOUNT_KEY, n.TRANSACTION_DATE, n.TYPE,
+    n.OPERATION, n.AMOUNT, n.BALANCE, n.K_SYMBOL
+)
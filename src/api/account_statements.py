@@ -0,0 +1,261 @@
+"""
+account_statements.py — Low-latency "show account X's transactions" lookups over FCT_TRANSACTIONS.
+
+HIGH-LEVEL EXPLANATION:
+    The most common production question is "show me account X's transactions
+    between dates A and B, page by page". Running client.execute() for that
+    opens a cursor, fetches everything and throws it away. This module does
+    it properly:
+
+      - PARAMETERIZED: account and dates are bind parameters. Pool
+        connections use the qmark paramstyle, so values are sent to Snowflake
+        separately and bound on the server. The connector's default
+        (pyformat) would escape them into the SQL text on the client instead.
+        So there's no injection, and every lookup sends the same SQL text
+      - KEYSET PAGINATION: page N+1 asks for rows AFTER the last
+        (TRANSACTION_DATE, TRANSACTION_KEY) of page N, instead of
+        OFFSET N * size — so page 500 costs the same as page 1
+      - POOLED CONNECTIONS: a fixed set of open connections, each with one
+        cursor that is reused for every lookup (no connect/cursor cost per call)
+      - PER-ACCOUNT LRU CACHE: recently viewed accounts keep their pages in
+        memory; the least recently used account is evicted first, and each
+        account keeps at most cached_pages pages (its least recently used
+        page goes first). Callers get copies, so changing a returned page
+        never changes what the cache serves next.
+
+    Usage:
+        pool = ConnectionPool(get_snowflake_config(), size=4)
+        api = AccountStatementAPI(pool, page_size=50)
+        page = api.get_page(2378, date(1996, 1, 1), date(1996, 12, 31))
+        page2 = api.get_page(2378, date(1996, 1, 1), date(1996, 12, 31), after=page["next_cursor"])
+
+WHY THIS MATTERS AT RBC:
+    Customer-facing screens (online banking statements) need answers in
+    milliseconds, over and over, for the same few accounts. OFFSET pagination
+    and connect-per-request are the two classic ways to make them slow.
+"""
+
+import logging
+import queue
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date
+
+from src.load.snowflake_client import SnowflakeClient
+
+logger = logging.getLogger("finflow.account_statements")
+
+STATEMENT_COLUMNS = [
+    "TRANSACTION_KEY", "TRANSACTION_DATE", "TYPE", "OPERATION", "AMOUNT", "BALANCE", "K_SYMBOL",
+]
+
+# The SQL text is fixed — only bind parameters change between calls
+FIRST_PAGE_SQL = f"""
+SELECT {", ".join(STATEMENT_COLUMNS)}
+FROM FINFLOW.ANALYTICS.FCT_TRANSACTIONS
+WHERE ACCOUNT_KEY = ?
+  AND TRANSACTION_DATE BETWEEN ? AND ?
+ORDER BY TRANSACTION_DATE, TRANSACTION_KEY
+LIMIT ?
+"""
+
+# Keyset condition: strictly after the last (date, key) seen on the previous page
+NEXT_PAGE_SQL = f"""
+SELECT {", ".join(STATEMENT_COLUMNS)}
+FROM FINFLOW.ANALYTICS.FCT_TRANSACTIONS
+WHERE ACCOUNT_KEY = ?
+  AND TRANSACTION_DATE BETWEEN ? AND ?
+  AND (TRANSACTION_DATE > ? OR (TRANSACTION_DATE = ? AND TRANSACTION_KEY > ?))
+ORDER BY TRANSACTION_DATE, TRANSACTION_KEY
+LIMIT ?
+"""
+
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_POOL_SIZE = 4
+DEFAULT_CACHED_ACCOUNTS = 256
+DEFAULT_CACHED_PAGES = 32
+
+# Server-side binding for the ? placeholders above (the connector default, pyformat, binds client-side)
+PARAMSTYLE = "qmark"
+
+
+class ConnectionPool:
+    """A fixed-size pool of open Snowflake connections, each with a reusable cursor."""
+
+    def __init__(self, config: dict, size: int = DEFAULT_POOL_SIZE, client_factory=SnowflakeClient):
+        """
+        Args:
+            config: Connection config from config.get_snowflake_config().
+            size: Number of connections to keep open.
+            client_factory: Builds a client from config (swap in a stand-in for tests).
+        """
+        self.config = config
+        self.size = size
+        self.client_factory = client_factory
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._all = []
+
+    def _open(self) -> dict:
+        client = self.client_factory({**self.config, "paramstyle": PARAMSTYLE})
+        client.connect()
+        entry = {"client": client, "cursor": client.conn.cursor()}
+        self._all.append(entry)
+        return entry
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection (opening one if the pool isn't full yet), then return it.
+
+        Yields:
+            A dict with "client" and its reusable "cursor".
+        """
+        try:
+            entry = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._created < self.size
+                if can_open:
+                    self._created += 1
+            if not can_open:
+                entry = self._idle.get()
+            else:
+                try:
+                    entry = self._open()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+
+        try:
+            yield entry
+        finally:
+            self._idle.put(entry)
+
+    def close(self):
+        """Close every connection the pool opened."""
+        for entry in self._all:
+            entry["cursor"].close()
+            entry["client"].close()
+        self._all.clear()
+        logger.info("Connection pool closed.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def copy_page(page: dict) -> dict:
+    """A copy of a cached page the caller can change freely (values are immutable scalars)."""
+    return {"rows": [dict(row) for row in page["rows"]], "next_cursor": page["next_cursor"]}
+
+
+class AccountStatementAPI:
+    """Paged transaction lookups by account and date range, with a per-account LRU cache."""
+
+    def __init__(self, pool: ConnectionPool, page_size: int = DEFAULT_PAGE_SIZE,
+                 cached_accounts: int = DEFAULT_CACHED_ACCOUNTS,
+                 cached_pages: int = DEFAULT_CACHED_PAGES):
+        """
+        Args:
+            pool: Where connections come from.
+            page_size: Default rows per page.
+            cached_accounts: How many accounts keep their pages in the cache.
+            cached_pages: How many pages each cached account keeps (every date
+                          range, cursor and page size is a separate page).
+        """
+        self.pool = pool
+        self.page_size = page_size
+        self.cached_accounts = cached_accounts
+        self.cached_pages = cached_pages
+        # {account_key: OrderedDict({(start, end, after, page_size): page})}, both levels
+        # in least-recently-used order
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _cache_get(self, account_key: int, page_key: tuple):
+        with self._cache_lock:
+            pages = self._cache.get(account_key)
+            if pages is None or page_key not in pages:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(account_key)
+            pages.move_to_end(page_key)
+            self.hits += 1
+            return pages[page_key]
+
+    def _cache_put(self, account_key: int, page_key: tuple, page: dict):
+        with self._cache_lock:
+            pages = self._cache.setdefault(account_key, OrderedDict())
+            pages[page_key] = page
+            pages.move_to_end(page_key)
+            while len(pages) > self.cached_pages:
+                pages.popitem(last=False)
+            self._cache.move_to_end(account_key)
+            while len(self._cache) > self.cached_accounts:
+                self._cache.popitem(last=False)
+
+    def invalidate(self, account_key: int = None):
+        """Drop cached pages for one account (e.g. after new transactions land), or all of them."""
+        with self._cache_lock:
+            if account_key is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(account_key, None)
+
+    def get_page(self, account_key: int, start_date: date, end_date: date,
+                 after: tuple = None, page_size: int = None) -> dict:
+        """Fetch one page of an account's transactions, oldest first.
+
+        Args:
+            account_key: The account to look up.
+            start_date, end_date: Inclusive date range.
+            after: The previous page's "next_cursor" — None for the first page.
+            page_size: Rows per page (defaults to the API's page_size).
+
+        Returns:
+            {"rows": [dict per transaction], "next_cursor": (date, key) or None}
+            next_cursor is None when this is the last page.
+        """
+        page_size = page_size or self.page_size
+        page_key = (start_date, end_date, after, page_size)
+        cached = self._cache_get(account_key, page_key)
+        if cached is not None:
+            return copy_page(cached)
+
+        # Ask for one extra row: if it comes back, there is a next page
+        if after is None:
+            sql, params = FIRST_PAGE_SQL, (account_key, start_date, end_date, page_size + 1)
+        else:
+            last_date, last_key = after
+            sql = NEXT_PAGE_SQL
+            params = (account_key, start_date, end_date, last_date, last_date, last_key, page_size + 1)
+
+        with self.pool.connection() as conn:
+            conn["cursor"].execute(sql, params)
+            results = conn["cursor"].fetchall()
+
+        rows = [dict(zip(STATEMENT_COLUMNS, r)) for r in results[:page_size]]
+        has_more = len(results) > page_size
+        next_cursor = (rows[-1]["TRANSACTION_DATE"], rows[-1]["TRANSACTION_KEY"]) if has_more else None
+
+        page = {"rows": rows, "next_cursor": next_cursor}
+        self._cache_put(account_key, page_key, page)
+        return copy_page(page)
+
+    def iter_transactions(self, account_key: int, start_date: date, end_date: date,
+                          page_size: int = None):
+        """Yield every transaction in the range, fetching one page at a time."""
+        after = None
+        while True:
+            page = self.get_page(account_key, start_date, end_date, after, page_size)
+            yield from page["rows"]
+            after = page["next_cursor"]
+            if after is None:
+                return
@@ -1,14 +1,33 @@
 """
-generate_charts.py — Creates 3 demo charts from ANALYTICS data in Snowflake.
+generate_charts.py — Creates the demo charts from a local snapshot of ANALYTICS data.
 
 HIGH-LEVEL EXPLANATION:
-    This script connects to Snowflake, runs analytics queries, and turns
-    the results into charts (PNG images) saved to the charts/ folder.
+    Instead of one Snowflake query per chart, ONE aggregation query pulls a
+    small "chart snapshot" (transaction count + amount per day x type x region,
+    ~50k rows) and saves it locally as Parquet. Every chart is then computed
+    from that snapshot with pandas, so adding a chart costs rendering time only.
+    The snapshot remembers the row count and LAST_ALTERED of the tables it was
+    built from; one INFORMATION_SCHEMA query per run tells whether they have
+    changed since, and only then is the snapshot rebuilt.
+
+    Rendering is also change-aware and parallel:
+      - Each chart's input data is hashed (together with the chart function's
+        code). If the hash matches the last render and the PNG exists, the
+        chart is skipped.
+      - Charts that do need rendering are drawn in parallel worker processes.
 
     Charts created:
       1. Monthly transaction volume (bar chart)
       2. Transaction type breakdown (pie chart)
       3. Performance improvement (before/after bar chart — no Snowflake needed)
+      5. Daily transaction volume (line chart)
+      6. Transaction volume by region (bar chart)
+    (Chart 4 comes from src/perf/clustering_experiment.py.)
+
+    Usage:
+        python -m src.charts.generate_charts             # reuse snapshot if tables unchanged, skip unchanged charts
+        python -m src.charts.generate_charts --refresh   # rebuild the snapshot regardless
+        python -m src.charts.generate_charts --force     # re-render everything
 
 WHY THIS MATTERS AT RBC:
     Data engineers often need to produce quick visualizations for stakeholders.
@@ -16,35 +35,166 @@ WHY THIS MATTERS AT RBC:
     go into a slide deck, a Confluence page, or a Jupyter notebook.
 """
 
+import argparse
+import hashlib
+import json
 import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 import matplotlib
 matplotlib.use("Agg")  # Non-interactive backend (no GUI window needed)
 import matplotlib.pyplot as plt
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pathlib import Path
 
-from src.config import get_snowflake_config
+from src.config import DATA_DIR, get_snowflake_config
 from src.load.snowflake_client import SnowflakeClient
 
 logger = logging.getLogger("finflow.charts")
 
 CHARTS_DIR = Path(__file__).resolve().parent.parent.parent / "charts"
+SNAPSHOT_PATH = DATA_DIR / ".cache" / "chart_snapshot.parquet"
+MANIFEST_PATH = CHARTS_DIR / ".chart_manifest.json"
+DPI = 150
+
+# One pass over the fact table feeds every chart. LEFT JOINs keep rows with a
+# missing date or account, so per-type totals still match the whole table.
+SNAPSHOT_SQL = """
+SELECT
+    f.TRANSACTION_DATE  AS DATE_KEY,
+    d.YEAR,
+    d.MONTH,
+    f.TYPE,
+    dist.REGION,
+    COUNT(*)            AS TXN_COUNT,
+    SUM(f.AMOUNT)       AS TOTAL_AMOUNT
+FROM FINFLOW.ANALYTICS.FCT_TRANSACTIONS f
+LEFT JOIN FINFLOW.ANALYTICS.DIM_DATE d ON f.TRANSACTION_DATE = d.DATE_KEY
+LEFT JOIN FINFLOW.ANALYTICS.DIM_ACCOUNT a ON f.ACCOUNT_KEY = a.ACCOUNT_KEY
+LEFT JOIN FINFLOW.ANALYTICS.DIM_DISTRICT dist ON a.DISTRICT_ID = dist.DISTRICT_KEY
+GROUP BY f.TRANSACTION_DATE, d.YEAR, d.MONTH, f.TYPE, dist.REGION
+"""
+SNAPSHOT_COLUMNS = ["DATE_KEY", "YEAR", "MONTH", "TYPE", "REGION", "TXN_COUNT", "TOTAL_AMOUNT"]
 
+# Metadata only, no warehouse needed: LAST_ALTERED moves on every DML or DDL,
+# so a reload or a stream_ingest merge into any of these tables changes it.
+SOURCE_VERSION_SQL = """
+SELECT TABLE_NAME, ROW_COUNT, LAST_ALTERED
+FROM FINFLOW.INFORMATION_SCHEMA.TABLES
+WHERE TABLE_SCHEMA = 'ANALYTICS'
+  AND TABLE_NAME IN ('FCT_TRANSACTIONS', 'DIM_DATE', 'DIM_ACCOUNT', 'DIM_DISTRICT')
+ORDER BY TABLE_NAME
+"""
+SOURCE_VERSION_KEY = b"finflow.source_version"
 
-def chart_monthly_volume(client: SnowflakeClient):
-    """Bar chart: monthly transaction volume over time."""
-    sql = """
-    SELECT
-        d.YEAR,
-        d.MONTH,
-        COUNT(*) AS TXN_COUNT
-    FROM FINFLOW.ANALYTICS.FCT_TRANSACTIONS f
-    JOIN FINFLOW.ANALYTICS.DIM_DATE d ON f.TRANSACTION_DATE = d.DATE_KEY
-    GROUP BY d.YEAR, d.MONTH
-    ORDER BY d.YEAR, d.MONTH
+
+def fetch_source_version(client: SnowflakeClient) -> str:
+    """Return the row count + LAST_ALTERED of every table the snapshot reads, as one string."""
+    return json.dumps([[str(value) for value in row] for row in client.execute(SOURCE_VERSION_SQL)])
+
+
+def snapshot_version(path: Path) -> str | None:
+    """Return the source version stored with a Parquet snapshot (None if it has none)."""
+    metadata = pq.read_schema(path).metadata or {}
+    version = metadata.get(SOURCE_VERSION_KEY)
+    return version.decode() if version is not None else None
+
+
+def fetch_chart_snapshot(client: SnowflakeClient) -> pd.DataFrame:
+    """Run the single snapshot query and return it as a DataFrame."""
+    start = time.time()
+    df = pd.DataFrame(client.execute(SNAPSHOT_SQL), columns=SNAPSHOT_COLUMNS)
+    df["DATE_KEY"] = pd.to_datetime(df["DATE_KEY"])
+    df["TXN_COUNT"] = df["TXN_COUNT"].astype("int64")
+    df["TOTAL_AMOUNT"] = df["TOTAL_AMOUNT"].astype("float64")
+    logger.info("Fetched chart snapshot: %d rows in %.2f sec", len(df), time.time() - start)
+    return df
+
+
+def load_chart_snapshot(refresh: bool = False, client: SnowflakeClient = None,
+                        path: Path = SNAPSHOT_PATH) -> pd.DataFrame:
+    """Return the chart snapshot, reading the local Parquet copy while the source tables are unchanged.
+
+    Args:
+        refresh: Re-query Snowflake even if the source tables haven't changed.
+        client: Reuse an open connection (otherwise one is opened here).
+        path: Where the Parquet snapshot lives.
     """
-    rows = client.execute(sql)
-    labels = [f"{int(r[0])}-{int(r[1]):02d}" for r in rows]
-    counts = [int(r[2]) for r in rows]
+    if client is None:
+        sf_client = SnowflakeClient(get_snowflake_config())
+        try:
+            sf_client.connect()
+        except Exception as e:
+            # Offline: a possibly stale snapshot beats no charts at all
+            if refresh or not path.exists():
+                raise
+            logger.warning("Can't reach Snowflake (%s) — using local chart snapshot unchecked: %s", e, path)
+            return pd.read_parquet(path, memory_map=True)
+        try:
+            return load_chart_snapshot(refresh, sf_client, path)
+        finally:
+            sf_client.close()
+
+    version = fetch_source_version(client)
+    if path.exists() and not refresh:
+        if snapshot_version(path) == version:
+            logger.info("Using local chart snapshot (source tables unchanged): %s", path)
+            return pd.read_parquet(path, memory_map=True)
+        logger.info("Source tables changed since the local chart snapshot — refreshing it")
+
+    df = fetch_chart_snapshot(client)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), SOURCE_VERSION_KEY: version.encode()})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(table, path)
+    logger.info("Saved chart snapshot: %s", path)
+    return df
+
+
+# --- Chart inputs: each takes the snapshot and returns exactly what its chart draws ---
+
+def monthly_volume_data(snapshot: pd.DataFrame) -> pd.DataFrame:
+    dated = snapshot.dropna(subset=["YEAR", "MONTH"])
+    return (dated.groupby(["YEAR", "MONTH"], as_index=False)["TXN_COUNT"].sum()
+            .sort_values(["YEAR", "MONTH"], ignore_index=True))
+
+
+def type_breakdown_data(snapshot: pd.DataFrame) -> pd.DataFrame:
+    labels = {"PRIJEM": "Credit (PRIJEM)", "VYDAJ": "Debit (VYDAJ)"}
+    df = snapshot.groupby("TYPE", as_index=False, dropna=False)["TXN_COUNT"].sum()
+    df["TXN_TYPE"] = df["TYPE"].map(labels).fillna(df["TYPE"])
+    return df[["TXN_TYPE", "TXN_COUNT"]].sort_values("TXN_COUNT", ascending=False, ignore_index=True)
+
+
+def performance_data(snapshot: pd.DataFrame) -> pd.DataFrame:
+    """Measured timings from docs/05_performance.md (no Snowflake needed)."""
+    return pd.DataFrame({
+        "QUERY": ["Query 1\nMonthly Volume", "Query 2\nTop 10 Accounts", "Query 3\nDate Range"],
+        "BEFORE_MS": [949, 546, 80],
+        "AFTER_MS": [312, 231, 101],
+    })
+
+
+def daily_volume_data(snapshot: pd.DataFrame) -> pd.DataFrame:
+    return (snapshot.dropna(subset=["DATE_KEY"]).groupby("DATE_KEY", as_index=False)["TXN_COUNT"].sum()
+            .sort_values("DATE_KEY", ignore_index=True))
+
+
+def region_volume_data(snapshot: pd.DataFrame) -> pd.DataFrame:
+    return (snapshot.dropna(subset=["REGION"])
+            .groupby("REGION", as_index=False)[["TXN_COUNT", "TOTAL_AMOUNT"]].sum()
+            .sort_values("TOTAL_AMOUNT", ascending=False, ignore_index=True))
+
+
+# --- Renderers: each takes its input DataFrame and a path, and saves one PNG ---
+
+def chart_monthly_volume(data: pd.DataFrame, path: Path):
+    """Bar chart: monthly transaction volume over time."""
+    labels = [f"{int(y)}-{int(m):02d}" for y, m in zip(data["YEAR"], data["MONTH"])]
+    counts = [int(c) for c in data["TXN_COUNT"]]
 
     # Show every 6th label to avoid crowding
     fig, ax = plt.subplots(figsize=(14, 5))
@@ -57,29 +207,14 @@ def chart_monthly_volume(client: SnowflakeClient):
     ax.grid(axis="y", alpha=0.3)
     fig.tight_layout()
 
-    path = CHARTS_DIR / "01_monthly_volume.png"
-    fig.savefig(path, dpi=150)
+    fig.savefig(path, dpi=DPI)
     plt.close(fig)
-    logger.info("Saved: %s", path)
 
 
-def chart_type_breakdown(client: SnowflakeClient):
+def chart_type_breakdown(data: pd.DataFrame, path: Path):
     """Pie chart: credit vs debit transaction breakdown."""
-    sql = """
-    SELECT
-        CASE TYPE
-            WHEN 'PRIJEM' THEN 'Credit (PRIJEM)'
-            WHEN 'VYDAJ' THEN 'Debit (VYDAJ)'
-            ELSE TYPE
-        END AS TXN_TYPE,
-        COUNT(*) AS CNT
-    FROM FINFLOW.ANALYTICS.FCT_TRANSACTIONS
-    GROUP BY TYPE
-    ORDER BY CNT DESC
-    """
-    rows = client.execute(sql)
-    labels = [r[0] for r in rows]
-    sizes = [int(r[1]) for r in rows]
+    labels = list(data["TXN_TYPE"])
+    sizes = [int(c) for c in data["TXN_COUNT"]]
     colors = ["#2563eb", "#dc2626", "#f59e0b", "#10b981"]
 
     fig, ax = plt.subplots(figsize=(7, 7))
@@ -93,17 +228,15 @@ def chart_type_breakdown(client: SnowflakeClient):
     ax.set_title("Transaction Type Breakdown", fontsize=14, fontweight="bold")
     fig.tight_layout()
 
-    path = CHARTS_DIR / "02_type_breakdown.png"
-    fig.savefig(path, dpi=150)
+    fig.savefig(path, dpi=DPI)
     plt.close(fig)
-    logger.info("Saved: %s", path)
 
 
-def chart_performance():
+def chart_performance(data: pd.DataFrame, path: Path):
     """Bar chart: query performance before/after clustering (no Snowflake needed)."""
-    queries = ["Query 1\nMonthly Volume", "Query 2\nTop 10 Accounts", "Query 3\nDate Range"]
-    before = [949, 546, 80]
-    after = [312, 231, 101]
+    queries = list(data["QUERY"])
+    before = [int(v) for v in data["BEFORE_MS"]]
+    after = [int(v) for v in data["AFTER_MS"]]
 
     x = range(len(queries))
     width = 0.35
@@ -129,30 +262,181 @@ def chart_performance():
     ax.grid(axis="y", alpha=0.3)
     fig.tight_layout()
 
-    path = CHARTS_DIR / "03_performance.png"
+    fig.savefig(path, dpi=DPI)
+    plt.close(fig)
+
+
+def chart_daily_volume(data: pd.DataFrame, path: Path):
+    """Line chart: daily transaction volume with a 30-day rolling average."""
+    fig, ax = plt.subplots(figsize=(14, 5))
+    ax.plot(data["DATE_KEY"], data["TXN_COUNT"], color="#94a3b8", linewidth=0.6, label="Daily")
+    ax.plot(data["DATE_KEY"], data["TXN_COUNT"].rolling(30, min_periods=1).mean(),
+            color="#2563eb", linewidth=2, label="30-day average")
+    ax.set_title("Daily Transaction Volume", fontsize=14, fontweight="bold")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Number of Transactions")
+    ax.legend(fontsize=10)
+    ax.grid(axis="y", alpha=0.3)
+    fig.tight_layout()
+
+    fig.savefig(path, dpi=DPI)
+    plt.close(fig)
+
+
+def chart_region_volume(data: pd.DataFrame, path: Path):
+    """Horizontal bar chart: total transaction amount per region."""
+    fig, ax = plt.subplots(figsize=(9, 5))
+    ax.barh(data["REGION"][::-1], data["TOTAL_AMOUNT"][::-1] / 1e6, color="#2563eb")
+    ax.set_title("Transaction Amount by Region", fontsize=14, fontweight="bold")
+    ax.set_xlabel("Total amount (millions)")
+    ax.grid(axis="x", alpha=0.3)
+    fig.tight_layout()
+
+    fig.savefig(path, dpi=DPI)
+    plt.close(fig)
+
+
+def chart_clustering_experiment(baseline: dict, results: list[dict], path: Path = None):
+    """Grouped bar chart: demo query times for the baseline and each candidate clustering key.
+
+    Takes the output of src/perf/clustering_experiment.py, so no Snowflake needed here.
+    """
+    runs = [baseline] + results
+    queries = list(baseline["query_ms"])
+    width = 0.8 / len(runs)
+    colors = ["#94a3b8", "#2563eb", "#10b981", "#f59e0b", "#dc2626", "#8b5cf6"]
+
+    fig, ax = plt.subplots(figsize=(max(9, len(queries) * 1.8), 5))
+    for i, run in enumerate(runs):
+        label = "Baseline" if run["key"] is None else f"CLUSTER BY ({run['key']})"
+        label += f" — depth {run['average_depth']}"
+        offsets = [q + (i - (len(runs) - 1) / 2) * width for q in range(len(queries))]
+        ax.bar(offsets, [run["query_ms"].get(q, 0) for q in queries], width,
+               label=label, color=colors[i % len(colors)])
+
+    ax.set_title("Query Performance by Clustering Key", fontsize=14, fontweight="bold")
+    ax.set_ylabel("Median duration (ms)")
+    ax.set_xticks(range(len(queries)))
+    ax.set_xticklabels([q.split(":")[0] for q in queries], fontsize=10)
+    ax.legend(fontsize=9)
+    ax.grid(axis="y", alpha=0.3)
+    fig.tight_layout()
+
+    path = path or CHARTS_DIR / "04_clustering_experiment.png"
+    path.parent.mkdir(parents=True, exist_ok=True)
     fig.savefig(path, dpi=150)
     plt.close(fig)
     logger.info("Saved: %s", path)
 
 
-def generate_all_charts():
-    """Generate all demo charts."""
-    CHARTS_DIR.mkdir(exist_ok=True)
+# (file name, input builder, renderer) — add a chart by adding a line here
+CHARTS = [
+    ("01_monthly_volume.png", monthly_volume_data, chart_monthly_volume),
+    ("02_type_breakdown.png", type_breakdown_data, chart_type_breakdown),
+    ("03_performance.png", performance_data, chart_performance),
+    ("05_daily_volume.png", daily_volume_data, chart_daily_volume),
+    ("06_region_volume.png", region_volume_data, chart_region_volume),
+]
+
+
+def code_fingerprint(code) -> bytes:
+    """Bytes that identify a function's code and stay the same across processes.
+
+    repr(co_consts) is not enough: nested code objects (comprehensions, lambdas)
+    print with their memory address, and frozenset constants print in hash-seed
+    order. Walk them instead.
+    """
+    parts = [code.co_code, repr(code.co_names).encode()]
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            parts.append(code_fingerprint(const))
+        elif isinstance(const, frozenset):
+            parts.append(repr(sorted(map(repr, const))).encode())
+        else:
+            parts.append(repr(const).encode())
+    return b"\0".join(parts)
+
+
+def chart_hash(data: pd.DataFrame, renderer) -> str:
+    """Fingerprint a chart: its input data, its renderer's code, and the DPI.
+
+    Including the renderer's code means editing a chart function re-renders it.
+    """
+    h = hashlib.sha256()
+    h.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    h.update(",".join(map(str, data.columns)).encode())
+    h.update(code_fingerprint(renderer.__code__))
+    h.update(str(DPI).encode())
+    return h.hexdigest()
+
+
+def render_chart(task: tuple) -> tuple[str, float]:
+    """Render one chart (runs in a worker process). Returns (file name, seconds)."""
+    renderer, data, path = task
+    start = time.time()
+    renderer(data, path)
+    return path.name, time.time() - start
+
+
+def generate_all_charts(refresh: bool = False, force: bool = False, workers: int = None,
+                        snapshot: pd.DataFrame = None, charts_dir: Path = CHARTS_DIR) -> dict:
+    """Generate all demo charts that changed since the last run.
+
+    Args:
+        refresh: Re-query Snowflake for the snapshot even if the source tables are unchanged.
+        force: Re-render every chart even if its input is unchanged.
+        workers: Processes to render with (default: one per CPU).
+        snapshot: Use this snapshot DataFrame instead of loading one.
+        charts_dir: Where PNGs and the render manifest are written.
+
+    Returns:
+        {"rendered": [file names], "skipped": [file names]}
+    """
+    charts_dir.mkdir(exist_ok=True)
     logger.info("=== Generating Demo Charts ===")
 
-    # Chart 3 doesn't need Snowflake
-    chart_performance()
+    if snapshot is None:
+        snapshot = load_chart_snapshot(refresh)
 
-    # Charts 1 & 2 need Snowflake data
-    sf_config = get_snowflake_config()
-    with SnowflakeClient(sf_config) as client:
-        chart_monthly_volume(client)
-        chart_type_breakdown(client)
+    manifest_path = charts_dir / MANIFEST_PATH.name
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
 
-    logger.info("=== All charts saved to %s ===", CHARTS_DIR)
+    tasks, hashes, skipped = [], {}, []
+    for file_name, build_data, renderer in CHARTS:
+        data = build_data(snapshot)
+        hashes[file_name] = chart_hash(data, renderer)
+        path = charts_dir / file_name
+        if not force and path.exists() and manifest.get(file_name) == hashes[file_name]:
+            skipped.append(file_name)
+            continue
+        tasks.append((renderer, data, path))
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks)) or 1
+    if workers == 1:
+        rendered = [render_chart(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = list(pool.map(render_chart, tasks))
+
+    for file_name, seconds in rendered:
+        manifest[file_name] = hashes[file_name]
+        logger.info("Saved: %s (%.2f sec)", charts_dir / file_name, seconds)
+    for file_name in skipped:
+        logger.info("Unchanged, skipped: %s", file_name)
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+
+    logger.info("=== Charts: %d rendered, %d unchanged (%s) ===", len(rendered), len(skipped), charts_dir)
+    return {"rendered": [name for name, _ in rendered], "skipped": skipped}
 
 
 if __name__ == "__main__":
     from src.logging_config import setup_logging
     setup_logging()
-    generate_all_charts()
+
+    parser = argparse.ArgumentParser(description="Generate the demo charts.")
+    parser.add_argument("--refresh", action="store_true", help="Rebuild the snapshot even if the tables are unchanged")
+    parser.add_argument("--force", action="store_true", help="Re-render unchanged charts too")
+    parser.add_argument("--workers", type=int, default=None, help="Render processes")
+    args = parser.parse_args()
+
+    generate_all_charts(refresh=args.refresh, force=args.force, workers=args.workers)
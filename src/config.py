@@ -49,6 +49,72 @@ def get_snowflake_config() -> dict:
     return config
 
 
+# Valid Snowflake warehouse sizes and the credits each one burns per hour
+WAREHOUSE_CREDITS_PER_HOUR = {
+    "XSMALL": 1, "SMALL": 2, "MEDIUM": 4, "LARGE": 8,
+    "XLARGE": 16, "XXLARGE": 32, "XXXLARGE": 64, "X4LARGE": 128,
+    "X5LARGE": 256, "X6LARGE": 512,
+}
+
+# Pipeline stages that can each run on their own compute profile
+PIPELINE_STAGES = ("load", "transform", "quality", "benchmarks")
+
+# Default profiles: only the transform (1M-row INSERT...SELECT) is worth a bigger
+# warehouse. Row-by-row loading and sub-second checks don't get faster with size.
+# After the stage the warehouse goes back to whatever size it had before.
+DEFAULT_WAREHOUSE_PROFILES = {
+    "transform": {"size": "MEDIUM"},
+}
+
+
+def get_warehouse_profiles() -> dict:
+    """Return the compute profile for each pipeline stage.
+
+    Each profile is a dict with:
+        warehouse:  warehouse to USE for the stage (None = the default warehouse)
+        size:       size to scale up/down to before the stage (None = leave as is)
+        scale_down: size to go to after the stage (None = the size it had before the stage)
+
+    Override any stage from .env, e.g. for the transform stage:
+        SNOWFLAKE_WAREHOUSE_TRANSFORM=FINFLOW_M
+        SNOWFLAKE_WAREHOUSE_SIZE_TRANSFORM=LARGE
+        SNOWFLAKE_WAREHOUSE_SCALE_DOWN_TRANSFORM=XSMALL
+    Set a value to an empty string to turn that default off.
+    """
+    profiles = {}
+    for stage in PIPELINE_STAGES:
+        key = stage.upper()
+        defaults = DEFAULT_WAREHOUSE_PROFILES.get(stage, {})
+        profile = {
+            "warehouse": os.getenv(f"SNOWFLAKE_WAREHOUSE_{key}") or None,
+            "size": os.getenv(f"SNOWFLAKE_WAREHOUSE_SIZE_{key}", defaults.get("size")) or None,
+            "scale_down": os.getenv(f"SNOWFLAKE_WAREHOUSE_SCALE_DOWN_{key}", defaults.get("scale_down")) or None,
+        }
+
+        # Fail fast on typos like "MEDUIM" instead of failing mid-pipeline
+        for field in ("size", "scale_down"):
+            if profile[field] is not None:
+                profile[field] = profile[field].upper()
+                if profile[field] not in WAREHOUSE_CREDITS_PER_HOUR:
+                    raise EnvironmentError(
+                        f"Invalid warehouse {field} for stage '{stage}': {profile[field]}. "
+                        f"Expected one of {list(WAREHOUSE_CREDITS_PER_HOUR)}."
+                    )
+        profiles[stage] = profile
+
+    return profiles
+
+
+# Suspend every warehouse the pipeline used once it finishes (instead of
+# waiting for AUTO_SUSPEND to kick in)
+SUSPEND_WAREHOUSE_AT_END = os.getenv("SNOWFLAKE_SUSPEND_AT_END", "true").lower() == "true"
+
+# RAW loader pipelining (src/load/load_raw.py): rows parsed per chunk, insert
+# batches buffered between the parser and the uploaders, and uploads in flight
+LOAD_CHUNK_ROWS = int(os.getenv("LOAD_CHUNK_ROWS", "50000"))
+LOAD_QUEUE_DEPTH = int(os.getenv("LOAD_QUEUE_DEPTH", "16"))
+LOAD_UPLOAD_WORKERS = int(os.getenv("LOAD_UPLOAD_WORKERS", "4"))
+
 # Schema names (used throughout the pipeline)
 SCHEMA_RAW = os.getenv("SNOWFLAKE_SCHEMA_RAW", "RAW")
 SCHEMA_ANALYTICS = os.getenv("SNOWFLAKE_SCHEMA_ANALYTICS", "ANALYTICS")
@@ -56,5 +122,21 @@ SCHEMA_ANALYTICS = os.getenv("SNOWFLAKE_SCHEMA_ANALYTICS", "ANALYTICS")
 # Path to the data/ directory where CSVs live
 DATA_DIR = Path(os.getenv("DATA_DIR", PROJECT_ROOT / "data"))
 
+# Landing directory watched by streaming ingestion (src/load/stream_ingest.py)
+LANDING_DIR = Path(os.getenv("LANDING_DIR", DATA_DIR / "landing"))
+
+# RAW tables whose rows are sorted before upload, so Snowflake writes micro-partitions
+# that each cover a narrow key range (natural clustering, no clustering key needed)
+LOAD_SORT_KEYS = {
+    "TRANS": ("DATE", "ACCOUNT_ID"),
+}
+# Sorting spills rows to disk in buckets of (leading sort column // width) and sorts
+# one bucket at a time, so memory is bounded by a bucket (YYMMDD / 100 = one month)
+LOAD_SORT_BUCKET_WIDTH = int(os.getenv("LOAD_SORT_BUCKET_WIDTH", "100"))
+
+# Columnar cache of parsed CSVs (src/load/csv_cache.py) — later loads skip CSV parsing
+USE_CSV_CACHE = os.getenv("CSV_CACHE", "true").lower() == "true"
+CSV_CACHE_DIR = Path(os.getenv("CSV_CACHE_DIR", DATA_DIR / ".cache" / "csv"))
+
 # Path to the sql/ directory
 SQL_DIR = PROJECT_ROOT / "sql"
@@ -0,0 +1,448 @@
+"""
+generate_berka.py — Generates a synthetic Czech banking (Berka) dataset at any scale.
+
+HIGH-LEVEL EXPLANATION:
+    The real dataset tops out at ~1M transactions, which is too small to see how
+    the loader, the transform SQL, or the demo queries behave at 10x or 100x the
+    volume. This script writes all 8 CSVs (account, card, client, disp, district,
+    loan, order, trans) in exactly the format the loader and
+    03_transform_raw_to_analytics.sql expect:
+      - ";" separators with quoted strings (same as the original files)
+      - YYMMDD dates (e.g. 930101)
+      - birth numbers with month + 50 for women (e.g. 706213)
+      - consistent foreign keys (every trans/loan/order/disp points to a real
+        account, every card to a real disp, every district_id to a real district)
+
+    SCALE FACTOR:
+    --scale 1 reproduces the row counts of the real dataset (1,056,320 trans).
+    --scale 100 gives ~105M transactions. District stays at 77 rows at every
+    scale because it's geography, not volume.
+
+    BOUNDED MEMORY:
+    The small tables are generated in one shot (450k accounts at scale 100 is
+    only a few MB). TRANS is generated one group of accounts at a time, so at
+    most TRANS_CHUNK_ROWS transactions live in memory, no matter the scale.
+    Every step is vectorized with numpy — no Python loop runs per row.
+
+    Usage:
+        python -m src.generate.generate_berka --scale 10 --seed 42
+        python -m src.generate.generate_berka --scale 0.1 --out /tmp/berka
+
+WHY THIS MATTERS AT RBC:
+    Production volumes are always bigger than the sample you develop against.
+    Synthetic data at a known scale lets you find the step that breaks first
+    (memory, load time, query time) before real data finds it for you.
+"""
+
+import argparse
+import csv
+import io
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from src.config import DATA_DIR
+
+logger = logging.getLogger("finflow.generate")
+
+# Row counts of the real dataset — multiplied by the scale factor
+BASE_ROW_COUNTS = {
+    "account": 4500,
+    "card": 892,
+    "client": 5369,
+    "disp": 5369,
+    "loan": 682,
+    "order": 6471,
+    "trans": 1056320,
+}
+NUM_DISTRICTS = 77
+
+# Max transactions held in memory at once while writing trans.csv
+TRANS_CHUNK_ROWS = 1_000_000
+
+# The dataset covers 1993-01-01 to 1998-12-31
+START_DATE = np.datetime64("1993-01-01")
+END_DATE = np.datetime64("1998-12-31")
+NUM_DAYS = int((END_DATE - START_DATE).astype(int)) + 1
+
+REGIONS = [
+    "Prague", "central Bohemia", "south Bohemia", "west Bohemia",
+    "north Bohemia", "east Bohemia", "south Moravia", "north Moravia",
+]
+FREQUENCIES = ["POPLATEK MESICNE", "POPLATEK TYDNE", "POPLATEK PO OBRATU"]
+FREQUENCY_WEIGHTS = [0.92, 0.05, 0.03]
+CARD_TYPES = ["classic", "junior", "gold"]
+CARD_TYPE_WEIGHTS = [0.74, 0.16, 0.10]
+LOAN_STATUSES = ["A", "B", "C", "D"]
+LOAN_STATUS_WEIGHTS = [0.30, 0.05, 0.59, 0.06]
+LOAN_DURATIONS = [12, 24, 36, 48, 60]
+BANK_CODES = ["AB", "CD", "EF", "GH", "IJ", "KL", "MN", "OP", "QR", "ST", "UV", "WX", "YZ"]
+ORDER_K_SYMBOLS = ["SIPO", "UVER", "POJISTNE", "LEASING", ""]
+ORDER_K_SYMBOL_WEIGHTS = [0.56, 0.11, 0.08, 0.05, 0.20]
+
+# (type, operation, k_symbol, weight, signed direction) — mirrors the real mix
+TRANS_KINDS = [
+    ("PRIJEM", "VKLAD", "", 0.148, 1),
+    ("PRIJEM", "PREVOD Z UCTU", "DUCHOD", 0.020, 1),
+    ("PRIJEM", "PREVOD Z UCTU", "", 0.040, 1),
+    ("PRIJEM", "", "UROK", 0.174, 1),
+    ("VYDAJ", "VYBER", "", 0.300, -1),
+    ("VYDAJ", "VYBER", "SLUZBY", 0.148, -1),
+    ("VYDAJ", "PREVOD NA UCET", "SIPO", 0.112, -1),
+    ("VYDAJ", "PREVOD NA UCET", "POJISTNE", 0.018, -1),
+    ("VYDAJ", "PREVOD NA UCET", "UVER", 0.012, -1),
+    ("VYDAJ", "VYBER KARTOU", "", 0.008, -1),
+    ("VYBER", "VYBER", "", 0.020, -1),
+]
+
+# Debits are ~62% of transactions, so credits are scaled up to bring in as much
+# money as debits take out on average — otherwise every balance drifts negative
+_CREDIT_SHARE = sum(k[3] for k in TRANS_KINDS if k[4] > 0) / sum(k[3] for k in TRANS_KINDS)
+CREDIT_AMOUNT_SCALE = (1 - _CREDIT_SHARE) / _CREDIT_SHARE
+
+# Every account opens with at least this much (the real data opens each account with a deposit)
+MIN_OPENING_BALANCE = 1_000.0
+
+
+def scaled_count(table: str, scale: float) -> int:
+    """Return the row count for a table at the given scale factor (at least 1)."""
+    return max(1, int(round(BASE_ROW_COUNTS[table] * scale)))
+
+
+def to_yymmdd(day_offsets: np.ndarray) -> np.ndarray:
+    """Convert day offsets from START_DATE into YYMMDD integers (e.g. 930101)."""
+    dates = START_DATE + day_offsets.astype("timedelta64[D]")
+    months = dates.astype("datetime64[M]")
+    year = dates.astype("datetime64[Y]").astype(np.int64) + 1970
+    month = months.astype(np.int64) % 12 + 1
+    day = (dates - months).astype(np.int64) + 1
+    return (year % 100) * 10000 + month * 100 + day
+
+
+def birth_numbers(rng: np.random.Generator, n: int) -> np.ndarray:
+    """Build YYMMDD birth numbers — for women the month is increased by 50."""
+    year = rng.integers(11, 88, size=n)  # born 1911-1987
+    month = rng.integers(1, 13, size=n)
+    day = rng.integers(1, 29, size=n)    # 1-28 is valid in every month
+    female = rng.random(n) < 0.5
+    month = np.where(female, month + 50, month)
+    return year * 10000 + month * 100 + day
+
+
+def write_csv(df: pd.DataFrame, target, header: bool = True):
+    """Write a DataFrame the way the original files look: ';' separated, strings quoted.
+
+    Args:
+        df: The rows to write.
+        target: A file path, or an open file handle when appending chunks.
+        header: Whether to write the header row.
+    """
+    df.to_csv(target, sep=";", index=False, header=header, quoting=csv.QUOTE_NONNUMERIC)
+
+
+def generate_districts(rng: np.random.Generator) -> pd.DataFrame:
+    """77 districts with the A1-A16 columns the RAW.DISTRICT table expects."""
+    ids = np.arange(1, NUM_DISTRICTS + 1)
+    population = rng.integers(40_000, 400_000, size=NUM_DISTRICTS)
+    population[0] = 1_204_953  # district 1 is Prague, like the real data
+    regions = np.array(REGIONS)[np.minimum((ids - 1) * len(REGIONS) // NUM_DISTRICTS, len(REGIONS) - 1)]
+    return pd.DataFrame({
+        "A1": ids,
+        "A2": [f"District {i:02d}" for i in ids],
+        "A3": regions,
+        "A4": population,
+        "A5": rng.integers(0, 150, size=NUM_DISTRICTS),
+        "A6": rng.integers(0, 70, size=NUM_DISTRICTS),
+        "A7": rng.integers(0, 20, size=NUM_DISTRICTS),
+        "A8": rng.integers(1, 11, size=NUM_DISTRICTS),
+        "A9": np.round(rng.uniform(33.0, 100.0, size=NUM_DISTRICTS), 1),
+        "A10": rng.integers(8_000, 12_600, size=NUM_DISTRICTS),
+        "A11": np.round(rng.uniform(0.2, 7.3, size=NUM_DISTRICTS), 2),
+        "A12": np.round(rng.uniform(0.4, 9.4, size=NUM_DISTRICTS), 2),
+        "A13": rng.integers(80, 170, size=NUM_DISTRICTS),
+        "A14": rng.integers(800, 86_000, size=NUM_DISTRICTS),
+        "A15": rng.integers(800, 100_000, size=NUM_DISTRICTS),
+        "A16": rng.integers(800, 100_000, size=NUM_DISTRICTS),
+    })
+
+
+def generate_accounts(rng: np.random.Generator, n: int) -> tuple[pd.DataFrame, np.ndarray]:
+    """Accounts opened between 1993 and 1997, so every account has history to transact on."""
+    open_offsets = rng.integers(0, NUM_DAYS - 365, size=n)
+    return pd.DataFrame({
+        "account_id": np.arange(1, n + 1),
+        "district_id": rng.integers(1, NUM_DISTRICTS + 1, size=n),
+        "frequency": rng.choice(FREQUENCIES, size=n, p=FREQUENCY_WEIGHTS),
+        "date": to_yymmdd(open_offsets),
+    }), open_offsets
+
+
+def generate_clients_and_disps(rng: np.random.Generator, num_accounts: int,
+                               num_clients: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """One OWNER client per account, plus DISPONENT clients attached to random accounts.
+
+    Client i owns account i, so the owner side of DISP never needs a lookup.
+    """
+    num_clients = max(num_clients, num_accounts)
+    client_ids = np.arange(1, num_clients + 1)
+
+    clients = pd.DataFrame({
+        "client_id": client_ids,
+        "birth_number": birth_numbers(rng, num_clients),
+        "district_id": rng.integers(1, NUM_DISTRICTS + 1, size=num_clients),
+    })
+
+    num_disponents = num_clients - num_accounts
+    account_ids = np.concatenate([
+        np.arange(1, num_accounts + 1),
+        rng.choice(num_accounts, size=num_disponents, replace=num_disponents > num_accounts) + 1,
+    ])
+    disps = pd.DataFrame({
+        "disp_id": client_ids,
+        "client_id": client_ids,
+        "account_id": account_ids,
+        "type": np.where(client_ids <= num_accounts, "OWNER", "DISPONENT"),
+    })
+    return clients, disps
+
+
+def generate_cards(rng: np.random.Generator, n: int, num_disps: int) -> pd.DataFrame:
+    """Cards point at a distinct disp; issue dates use the original 'YYMMDD 00:00:00' format."""
+    n = min(n, num_disps)
+    issued = to_yymmdd(rng.integers(365, NUM_DAYS, size=n))
+    return pd.DataFrame({
+        "card_id": np.arange(1, n + 1),
+        "disp_id": rng.choice(num_disps, size=n, replace=False) + 1,
+        "type": rng.choice(CARD_TYPES, size=n, p=CARD_TYPE_WEIGHTS),
+        "issued": pd.Series(issued).astype(str) + " 00:00:00",
+    })
+
+
+def generate_loans(rng: np.random.Generator, n: int, open_offsets: np.ndarray) -> pd.DataFrame:
+    """At most one loan per account, granted after the account was opened."""
+    num_accounts = len(open_offsets)
+    n = min(n, num_accounts)
+    account_idx = rng.choice(num_accounts, size=n, replace=False)
+    start = open_offsets[account_idx]
+    loan_offsets = start + (rng.random(n) * (NUM_DAYS - start)).astype(np.int64)
+    amount = rng.integers(4_000, 600_000, size=n)
+    duration = rng.choice(LOAN_DURATIONS, size=n)
+    return pd.DataFrame({
+        "loan_id": np.arange(1, n + 1),
+        "account_id": account_idx + 1,
+        "date": to_yymmdd(loan_offsets),
+        "amount": amount,
+        "duration": duration,
+        "payments": np.round(amount / duration, 2),
+        "status": rng.choice(LOAN_STATUSES, size=n, p=LOAN_STATUS_WEIGHTS),
+    })
+
+
+def generate_orders(rng: np.random.Generator, n: int, num_accounts: int) -> pd.DataFrame:
+    """Standing orders to partner banks; account_to is an 8-digit string like the original."""
+    return pd.DataFrame({
+        "order_id": np.arange(1, n + 1),
+        "account_id": rng.integers(1, num_accounts + 1, size=n),
+        "bank_to": rng.choice(BANK_CODES, size=n),
+        "account_to": pd.Series(rng.integers(0, 100_000_000, size=n)).astype(str).str.zfill(8),
+        "amount": np.round(rng.uniform(1.0, 15_000.0, size=n), 1),
+        "k_symbol": rng.choice(ORDER_K_SYMBOLS, size=n, p=ORDER_K_SYMBOL_WEIGHTS),
+    })
+
+
+def generate_trans_chunk(rng: np.random.Generator, account_ids: np.ndarray,
+                         open_offsets: np.ndarray, counts: np.ndarray,
+                         first_trans_id: int) -> pd.DataFrame:
+    """Generate every transaction for a group of accounts.
+
+    Rows come out sorted by (account, date) so BALANCE can be a running total
+    per account, computed with one cumsum instead of a per-account loop.
+    """
+    n = int(counts.sum())
+    acct = np.repeat(account_ids, counts)
+    start = np.repeat(open_offsets, counts)
+    day = start + (rng.random(n) * (NUM_DAYS - start)).astype(np.int64)
+
+    order = np.lexsort((day, acct))
+    acct, day = acct[order], day[order]
+
+    weights = np.array([k[3] for k in TRANS_KINDS])
+    kind = rng.choice(len(TRANS_KINDS), size=n, p=weights / weights.sum())
+    types = np.array([k[0] for k in TRANS_KINDS])[kind]
+    operations = np.array([k[1] for k in TRANS_KINDS])[kind]
+    k_symbols = np.array([k[2] for k in TRANS_KINDS])[kind]
+    direction = np.array([k[4] for k in TRANS_KINDS])[kind]
+
+    amount = rng.lognormal(mean=7.5, sigma=1.3, size=n)
+    amount = np.round(np.minimum(np.where(direction > 0, amount * CREDIT_AMOUNT_SCALE, amount), 87_000.0), 1)
+
+    # Running balance per account: global cumsum minus the cumsum at each account's start
+    signed = amount * direction
+    running = np.cumsum(signed)
+    boundaries = np.flatnonzero(np.r_[True, acct[1:] != acct[:-1]])
+    group_sizes = np.diff(np.r_[boundaries, n])
+    flow = running - np.repeat(running[boundaries] - signed[boundaries], group_sizes)
+
+    # Opening balance: big enough that the account never goes below MIN_OPENING_BALANCE,
+    # as if each account's first deposit covered its lowest point
+    lowest = np.minimum.reduceat(flow, boundaries) if n else flow
+    opening = MIN_OPENING_BALANCE - np.minimum(lowest, 0.0)
+    balance = np.round(flow + np.repeat(opening, group_sizes), 1)
+
+    # Transfers carry a partner bank + account, everything else leaves them blank
+    is_transfer = np.char.startswith(operations, "PREVOD")
+    bank = np.where(is_transfer, rng.choice(BANK_CODES, size=n), "")
+    partner = np.where(is_transfer, rng.integers(10_000_000, 100_000_000, size=n), 0)
+
+    return pd.DataFrame({
+        "trans_id": np.arange(first_trans_id, first_trans_id + n),
+        "account_id": acct,
+        "date": to_yymmdd(day),
+        "type": types,
+        "operation": operations,
+        "amount": amount,
+        "balance": balance,
+        "k_symbol": k_symbols,
+        "bank": bank,
+        "account": pd.Series(partner, dtype="Int64").where(is_transfer),
+    })
+
+
+def render_trans_chunk(task: tuple) -> bytes:
+    """Generate one chunk of TRANS and render it to CSV bytes (runs in a worker process).
+
+    Each chunk gets its own child seed, so the output only depends on the seed
+    and the chunk boundaries — never on how many workers rendered it.
+    """
+    seed_seq, account_ids, open_offsets, counts, first_trans_id, header = task
+    rng = np.random.default_rng(seed_seq)
+    chunk = generate_trans_chunk(rng, account_ids, open_offsets, counts, first_trans_id)
+    buffer = io.StringIO()
+    write_csv(chunk, buffer, header=header)
+    return buffer.getvalue().encode()
+
+
+def render_in_order(tasks, workers: int):
+    """Yield rendered chunks in task order, keeping at most 2 per worker in flight."""
+    if workers == 1:
+        yield from map(render_trans_chunk, tasks)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for task in tasks:
+            in_flight.append(pool.submit(render_trans_chunk, task))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def write_trans(rng: np.random.Generator, path: Path, num_trans: int,
+                open_offsets: np.ndarray, seed: int, chunk_rows: int = TRANS_CHUNK_ROWS,
+                workers: int = None) -> int:
+    """Stream trans.csv to disk one group of accounts at a time.
+
+    CSV rendering is the slow part (~5 sec per 1M rows in pandas), so chunks are
+    rendered in parallel worker processes and written to the file in order.
+
+    Returns:
+        The number of transaction rows written.
+    """
+    num_accounts = len(open_offsets)
+    workers = workers or os.cpu_count() or 1
+
+    # Older accounts get proportionally more transactions
+    history = (NUM_DAYS - open_offsets).astype(np.float64)
+    counts = rng.multinomial(num_trans, history / history.sum())
+
+    # Split accounts into groups whose transaction total stays under chunk_rows
+    cumulative = np.cumsum(counts)
+    cuts = np.searchsorted(cumulative, np.arange(chunk_rows, cumulative[-1], chunk_rows), side="right")
+    edges = np.unique(np.r_[0, cuts, num_accounts])
+    child_seeds = np.random.SeedSequence(seed).spawn(len(edges) - 1)
+
+    tasks = (
+        (child_seeds[i], np.arange(lo + 1, hi + 1), open_offsets[lo:hi], counts[lo:hi],
+         int(cumulative[lo - 1]) + 1 if lo else 1, i == 0)
+        for i, (lo, hi) in enumerate(zip(edges[:-1], edges[1:]))
+    )
+
+    written = 0
+    with open(path, "wb") as f:
+        for i, data in enumerate(render_in_order(tasks, workers)):
+            f.write(data)
+            written = int(cumulative[edges[i + 1] - 1])
+            logger.info("  trans.csv: %d / %d rows written", written, num_trans)
+    return written
+
+
+def generate_dataset(out_dir: Path = DATA_DIR, scale: float = 1.0, seed: int = 42,
+                     chunk_rows: int = TRANS_CHUNK_ROWS, workers: int = None) -> dict:
+    """Write all 8 Berka CSVs to out_dir at the given scale factor.
+
+    Args:
+        out_dir: Directory to write the CSVs into (created if missing).
+        scale: Multiplier on the real dataset's row counts (1.0 = ~1M transactions).
+        seed: Random seed — the same seed and scale always produce identical files.
+        chunk_rows: Max transactions generated per chunk.
+        workers: Processes rendering trans.csv in parallel (default: all CPUs).
+
+    Returns:
+        A dict of {file name: rows written}.
+    """
+    if scale <= 0:
+        raise ValueError(f"scale must be positive, got {scale}")
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    start = time.time()
+    logger.info("=== Generating synthetic Berka dataset (scale=%s, seed=%d) ===", scale, seed)
+
+    num_accounts = scaled_count("account", scale)
+    accounts, open_offsets = generate_accounts(rng, num_accounts)
+    clients, disps = generate_clients_and_disps(rng, num_accounts, scaled_count("client", scale))
+
+    tables = {
+        "district": generate_districts(rng),
+        "account": accounts,
+        "client": clients,
+        "disp": disps,
+        "card": generate_cards(rng, scaled_count("card", scale), len(disps)),
+        "loan": generate_loans(rng, scaled_count("loan", scale), open_offsets),
+        "order": generate_orders(rng, scaled_count("order", scale), num_accounts),
+    }
+
+    row_counts = {}
+    for name, df in tables.items():
+        write_csv(df, out_dir / f"{name}.csv")
+        row_counts[f"{name}.csv"] = len(df)
+        logger.info("Wrote %d rows to %s.csv", len(df), name)
+
+    row_counts["trans.csv"] = write_trans(
+        rng, out_dir / "trans.csv", scaled_count("trans", scale), open_offsets, seed,
+        chunk_rows=chunk_rows, workers=workers,
+    )
+
+    logger.info("=== Dataset written to %s in %.1f sec ===", out_dir, time.time() - start)
+    return row_counts
+
+
+if __name__ == "__main__":
+    from src.logging_config import setup_logging
+    setup_logging()
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic Berka dataset.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Scale factor (1 = ~1M transactions)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--out", type=Path, default=DATA_DIR, help="Output directory")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for trans.csv")
+    args = parser.parse_args()
+
+    generate_dataset(args.out, scale=args.scale, seed=args.seed, workers=args.workers)
@@ -0,0 +1,149 @@
+"""
+csv_cache.py — Caches parsed CSVs as compressed Arrow files, so each CSV is parsed once.
+
+HIGH-LEVEL EXPLANATION:
+    Every pipeline run used to re-parse the same large CSVs with pandas. This
+    module keeps a columnar copy of each one in data/.cache/csv/:
+
+      trans.csv  ->  trans-<source>-<fingerprint>.arrow   (Arrow IPC / Feather v2, LZ4)
+
+    <source> identifies the CSV's full path and the variant (e.g. "sorted by
+    DATE"), so two trans.csv files in different folders, or a sorted and an
+    unsorted copy of one file, never share (or delete) each other's cache. The
+    fingerprint is built from CACHE_FORMAT_VERSION, the path, and the file's
+    size and modification time, so editing or replacing a CSV — or changing
+    how CSVs are parsed — gives it a new cache file automatically (the old
+    one is deleted).
+
+      FIRST RUN:  chunks are parsed from the CSV as usual; each chunk is also
+                  appended to the cache file as it goes by (no second pass)
+      LATER RUNS: the cache file is memory-mapped and read back chunk by
+                  chunk — no CSV parsing at all
+
+    Values are stored exactly as the parser produced them (strings, with
+    blanks as null), so cached and uncached loads send identical rows. Rows
+    are stored in the order the loader uploads them, so a sorted table's
+    cache is already sorted and later loads skip the sort too.
+
+    Usage:
+        chunks = cached_chunks(Path("data/trans.csv"), 50_000, read_csv_chunks)
+        for df in chunks:
+            ...
+
+WHY THIS MATTERS AT RBC:
+    Text formats are for exchanging data, not for re-reading it. Converting
+    once to a columnar format is the standard first step in any pipeline that
+    reads the same input more than once.
+"""
+
+import hashlib
+import logging
+from pathlib import Path
+
+import pyarrow as pa
+
+from src.config import CSV_CACHE_DIR
+
+logger = logging.getLogger("finflow.csv_cache")
+
+# Bump whenever the rows a parser produces change (read_csv_chunks' separator
+# detection, dtype, column normalization...), so old caches are never served
+CACHE_FORMAT_VERSION = 1
+
+COMPRESSION = "lz4"
+SOURCE_CHARS = 8
+FINGERPRINT_CHARS = 16
+
+
+def _short_hash(text: str, chars: int) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:chars]
+
+
+def source_key(csv_path: Path, variant: str = "") -> str:
+    """A short key for the CSV's full path and variant (same for every version of that file)."""
+    return _short_hash(f"{csv_path.resolve()}|{variant}", SOURCE_CHARS)
+
+
+def fingerprint(csv_path: Path, variant: str = "") -> str:
+    """A short key that changes with the file's path, size, mtime, variant or CACHE_FORMAT_VERSION."""
+    stat = csv_path.stat()
+    key = f"v{CACHE_FORMAT_VERSION}|{csv_path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}|{variant}"
+    return _short_hash(key, FINGERPRINT_CHARS)
+
+
+def cache_path(csv_path: Path, cache_dir: Path = CSV_CACHE_DIR, variant: str = "") -> Path:
+    """Where csv_path's cache file lives (whether or not it exists yet)."""
+    return Path(cache_dir) / f"{csv_path.stem}-{source_key(csv_path, variant)}-{fingerprint(csv_path, variant)}.arrow"
+
+
+def read_cache(path: Path, chunk_rows: int):
+    """Memory-map a cache file and yield it as DataFrames of up to chunk_rows rows.
+
+    Record batches are decompressed one at a time, so memory use stays at
+    about one batch no matter how big the file is.
+    """
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            for offset in range(0, batch.num_rows, chunk_rows):
+                yield batch.slice(offset, chunk_rows).to_pandas()
+
+
+def write_through(chunks, path: Path):
+    """Yield each chunk unchanged while appending it to a new cache file at path.
+
+    The file is written under a temporary name and only renamed into place once
+    every chunk has been written, so an interrupted run never leaves a partial cache.
+    """
+    tmp = path.with_suffix(".arrow.tmp")
+    writer = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                schema = pa.schema([(col, pa.string()) for col in chunk.columns])
+                writer = pa.ipc.new_file(str(tmp), schema,
+                                         options=pa.ipc.IpcWriteOptions(compression=COMPRESSION))
+            writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+            yield chunk
+
+        if writer is None:
+            return  # empty file — nothing worth caching
+        writer.close()
+        writer = None
+        tmp.replace(path)
+        logger.info("Cached %s (%.1f MB)", path.name, path.stat().st_size / 1_048_576)
+    finally:
+        if writer is not None:
+            writer.close()
+        tmp.unlink(missing_ok=True)
+
+
+def cached_chunks(csv_path: Path, chunk_rows: int, parse_chunks, cache_dir: Path = CSV_CACHE_DIR,
+                  variant: str = ""):
+    """Yield csv_path as DataFrame chunks, from its cache if it has one.
+
+    Args:
+        csv_path: The source CSV.
+        chunk_rows: Rows per yielded chunk.
+        parse_chunks: parse_chunks(csv_path, chunk_rows) -> iterable of string
+                      DataFrames. Only called on a cache miss.
+        cache_dir: Where cache files live.
+        variant: Describes how parse_chunks transforms the rows (e.g. "sorted by DATE"),
+                 so a differently-prepared copy of the same CSV gets its own cache.
+    """
+    path = cache_path(csv_path, cache_dir, variant)
+    if path.exists():
+        logger.info("Reading %s from cache %s", csv_path.name, path.name)
+        yield from read_cache(path, chunk_rows)
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Caches of older versions of this CSV (same path, same variant) will never be read again
+    stale_pattern = f"{csv_path.stem}-{source_key(csv_path, variant)}-{'?' * FINGERPRINT_CHARS}.arrow"
+    for stale in path.parent.glob(stale_pattern):
+        stale.unlink()
+
+    logger.info("No cache for %s — parsing and caching it", csv_path.name)
+    yield from write_through(parse_chunks(csv_path, chunk_rows), path)
+
@@ -18,6 +18,31 @@ HIGH-LEVEL EXPLANATION:
       - INSERT rows in batches of 1000 using executemany()
     This is reliable across all network configurations.
 
+    PIPELINING:
+    Parsing and uploading overlap instead of running one after the other:
+
+      producer thread   read chunk k+1 -> NaN -> strings -> tuples -> 1000-row batches
+                              |
+                        bounded queue (LOAD_QUEUE_DEPTH batches)
+                              |
+      upload threads    executemany() batch, LOAD_UPLOAD_WORKERS in flight at once
+
+    While the uploaders wait on the network, the producer is already parsing
+    the next chunk. The queue is bounded, so a slow network never lets parsed
+    rows pile up in memory. Each stage's busy and idle time is logged per file,
+    which shows whether parsing or uploading is the bottleneck.
+
+    ORDERING:
+    Tables listed in config.LOAD_SORT_KEYS (RAW.TRANS: date, then account) are
+    sorted before upload. Every batch then holds a narrow range of dates, so
+    the micro-partitions Snowflake writes come out naturally clustered. The
+    sort spills month buckets to disk (see sort_chunks), so memory doesn't
+    grow with the file, and the sorted rows go into the cache below.
+
+    CACHING:
+    The first load of a CSV also writes a columnar copy to data/.cache/csv/;
+    later loads memory-map that instead of parsing the CSV (see csv_cache.py).
+
 WHY THIS MATTERS AT RBC:
     Every data pipeline starts by ingesting raw data from somewhere (files, APIs,
     databases). The pattern of "load raw first, transform later" is standard because
@@ -25,76 +50,376 @@ WHY THIS MATTERS AT RBC:
 """
 
 import logging
+import queue
+import tempfile
+import threading
+import time
+from functools import partial
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 from pathlib import Path
 
-from src.config import DATA_DIR, SCHEMA_RAW
+from src.config import (
+    CSV_CACHE_DIR, DATA_DIR, LOAD_CHUNK_ROWS, LOAD_QUEUE_DEPTH, LOAD_SORT_BUCKET_WIDTH, LOAD_SORT_KEYS,
+    LOAD_UPLOAD_WORKERS, SCHEMA_RAW, USE_CSV_CACHE,
+)
+from src.load.csv_cache import cached_chunks
 from src.load.snowflake_client import SnowflakeClient
 
 logger = logging.getLogger("finflow.load_raw")
 
 BATCH_SIZE = 1000
+PROGRESS_EVERY_ROWS = 100_000
 
+# Marks the end of the batch queue for upload threads
+_DONE = object()
 
-def load_csv_to_snowflake(client: SnowflakeClient, csv_path: Path, table_name: str):
-    """Load a single CSV file into a Snowflake RAW table.
 
-    Strategy: TRUNCATE + batch INSERT using executemany().
-    We send rows in chunks of 1000 for efficiency.
+def normalize_columns(columns) -> list[str]:
+    """Normalize column names to uppercase with underscores (Snowflake convention)."""
+    return [col.strip().upper().replace(" ", "_") for col in columns]
 
-    Args:
-        client: An active SnowflakeClient connection.
-        csv_path: Path to the CSV file.
-        table_name: The Snowflake table name to load into (e.g., "ACCOUNT").
-    """
-    logger.info("Reading CSV: %s", csv_path.name)
 
+def read_csv_header(csv_path: Path) -> tuple[str, list[str]]:
+    """Detect the separator and return (sep, normalized column names) without reading any rows."""
     # Try semicolon separator first (Czech banking dataset uses ";"), fall back to comma
-    df = pd.read_csv(csv_path, sep=";", low_memory=False)
-    if len(df.columns) == 1:
-        df = pd.read_csv(csv_path, sep=",", low_memory=False)
+    sep = ";"
+    columns = pd.read_csv(csv_path, sep=sep, nrows=0).columns
+    if len(columns) == 1:
+        sep = ","
+        columns = pd.read_csv(csv_path, sep=sep, nrows=0).columns
+    return sep, normalize_columns(columns)
+
+
+def read_csv_chunks(csv_path: Path, chunk_rows: int = LOAD_CHUNK_ROWS, sep: str = None):
+    """Yield a CSV as DataFrames of up to chunk_rows rows.
+
+    Values are kept as the text in the file (dtype=str) rather than type-inferred:
+    inference runs per chunk, so the same column could come out as "12" in one
+    chunk and "12.0" in the next.
+    """
+    if sep is None:
+        sep, _ = read_csv_header(csv_path)
+    for chunk in pd.read_csv(csv_path, sep=sep, dtype=str, chunksize=chunk_rows):
+        chunk.columns = normalize_columns(chunk.columns)
+        yield chunk
+
+
+def _sort_order(keys: pd.DataFrame) -> pd.Index:
+    """Stable sort order of keys' rows, comparing columns as numbers where they all parse as numbers."""
+    columns = {}
+    for i, col in enumerate(keys.columns):
+        numeric = pd.to_numeric(keys[col], errors="coerce")
+        columns[i] = numeric if numeric.notna().sum() == keys[col].notna().sum() else keys[col]
+    return pd.DataFrame(columns).sort_values(list(columns), kind="stable", na_position="last").index
+
+
+def sort_chunks(chunks, sort_by: list[str], chunk_rows: int = LOAD_CHUNK_ROWS,
+                bucket_width: int = LOAD_SORT_BUCKET_WIDTH, spill_dir: Path = None):
+    """Sort rows from every chunk by the sort_by columns and yield them re-chunked.
 
-    row_count = len(df)
-    logger.info("Read %d rows from %s", row_count, csv_path.name)
+    Bucketed so memory stays bounded by one bucket, not the whole file:
 
-    # Normalize column names to uppercase (Snowflake convention)
-    df.columns = [col.strip().upper().replace(" ", "_") for col in df.columns]
+      1. SPILL: each chunk's rows are split by bucket = leading sort column
+         // bucket_width (YYMMDD dates / 100 = one bucket per month) and
+         appended to that bucket's Arrow file in a temporary directory.
+         Rows whose leading column isn't a number go to a last bucket.
+      2. SORT: buckets are read back one at a time in key order, sorted, and
+         yielded in chunk_rows slices. The first batch is ready as soon as
+         the smallest bucket is sorted, so uploading overlaps with sorting
+         the remaining buckets.
 
-    # Replace NaN with None (Snowflake expects None for NULL, not pandas NaN)
-    df = df.where(df.notna(), None)
+    Columns are compared as numbers where they parse as numbers (the file
+    holds text, and "9" should sort before "10"). The sort is stable, so rows
+    with equal keys keep their file order.
+    """
+    sort_by = list(sort_by)
+    with tempfile.TemporaryDirectory(prefix="finflow-sort-", dir=spill_dir) as tmp:
+        writers, paths, schema = {}, {}, None
+        try:
+            for chunk in chunks:
+                if schema is None:
+                    missing = [col for col in sort_by if col not in chunk.columns]
+                    if missing:
+                        raise ValueError(f"Sort column(s) {missing} not found (columns: {list(chunk.columns)})")
+                    schema = pa.schema([(col, pa.string()) for col in chunk.columns])
+
+                lead = pd.to_numeric(chunk[sort_by[0]], errors="coerce") // bucket_width
+                for bucket, rows in chunk.groupby(lead.fillna(np.inf), sort=False):
+                    if bucket not in writers:
+                        paths[bucket] = Path(tmp) / f"bucket-{len(paths)}.arrow"
+                        writers[bucket] = pa.ipc.new_stream(str(paths[bucket]), schema)
+                    writers[bucket].write_batch(pa.RecordBatch.from_pandas(rows, schema=schema,
+                                                                           preserve_index=False))
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        for bucket in sorted(paths):
+            with pa.memory_map(str(paths[bucket])) as source:
+                table = pa.ipc.open_stream(source).read_all()
+            order = _sort_order(table.select(sort_by).to_pandas())
+            table = table.take(pa.array(order, type=pa.int64()))
+            for offset in range(0, table.num_rows, chunk_rows):
+                yield table.slice(offset, chunk_rows).to_pandas()
+            del table
+            paths[bucket].unlink()
+
+
+def read_sorted_csv_chunks(csv_path: Path, chunk_rows: int, sort_by: list[str], sep: str = None,
+                           spill_dir: Path = None):
+    """read_csv_chunks(), sorted by the sort_by columns (see sort_chunks)."""
+    logger.info("Sorting %s by %s before upload", csv_path.name, ", ".join(sort_by))
+    return sort_chunks(read_csv_chunks(csv_path, chunk_rows, sep), sort_by, chunk_rows, spill_dir=spill_dir)
 
-    # Convert all values to strings (RAW tables are all VARCHAR)
+
+def replace_nan(df: pd.DataFrame) -> pd.DataFrame:
+    """Replace NaN with None (Snowflake expects None for NULL, not pandas NaN)."""
+    return df.where(df.notna(), None)
+
+
+def stringify_values(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert all values to stripped strings (RAW tables are all VARCHAR)."""
+    df = df.copy()
     for col in df.columns:
-        df.loc[:, col] = df[col].apply(lambda x: str(x).strip() if x is not None else None)
+        df[col] = df[col].apply(lambda x: str(x).strip() if x is not None else None)
+    return df
 
-    # Quote the table name in case it's a reserved word (like ORDER)
-    qualified_table = f'FINFLOW.{SCHEMA_RAW}."{table_name}"'
 
-    # Truncate for idempotency (safe to re-run)
-    logger.info("Truncating %s ...", qualified_table)
-    client.execute(f'TRUNCATE TABLE {qualified_table}')
+def build_rows(df: pd.DataFrame) -> list[tuple]:
+    """Turn a DataFrame into the list of tuples executemany() expects."""
+    return [tuple(row) for row in df.values]
+
+
+def insert_statement(qualified_table: str, columns: list[str]) -> str:
+    """Build the INSERT statement with one %s placeholder per column."""
+    cols = ", ".join(columns)
+    placeholders = ", ".join(["%s"] * len(columns))
+    return f'INSERT INTO {qualified_table} ({cols}) VALUES ({placeholders})'
 
-    # Build INSERT statement with placeholders
-    cols = ", ".join(df.columns)
-    placeholders = ", ".join(["%s"] * len(df.columns))
-    insert_sql = f'INSERT INTO {qualified_table} ({cols}) VALUES ({placeholders})'
 
-    # Insert in batches
-    rows = [tuple(row) for row in df.values]
+def insert_rows(client: SnowflakeClient, qualified_table: str, columns: list[str],
+                rows: list[tuple], batch_size: int = BATCH_SIZE) -> int:
+    """Send rows to Snowflake in batches using executemany().
+
+    Returns:
+        The number of rows inserted.
+    """
+    insert_sql = insert_statement(qualified_table, columns)
+
     total_loaded = 0
     cursor = client.conn.cursor()
 
     try:
-        for i in range(0, len(rows), BATCH_SIZE):
-            batch = rows[i:i + BATCH_SIZE]
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i:i + batch_size]
             cursor.executemany(insert_sql, batch)
             total_loaded += len(batch)
             if total_loaded % 10000 == 0 or total_loaded == len(rows):
-                logger.info("  %s: %d / %d rows loaded", table_name, total_loaded, len(rows))
+                logger.info("  %s: %d / %d rows loaded", qualified_table, total_loaded, len(rows))
     finally:
         cursor.close()
 
-    logger.info("Loaded %d rows into %s", total_loaded, qualified_table)
+    return total_loaded
+
+
+def _timed_iter(iterable, stats: dict, key: str):
+    """Yield from iterable, adding the time spent producing each item to stats[key]."""
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            stats[key] += time.perf_counter() - start
+        yield item
+
+
+def pipelined_insert(client: SnowflakeClient, qualified_table: str, columns: list[str], chunks,
+                     batch_size: int = BATCH_SIZE, queue_depth: int = LOAD_QUEUE_DEPTH,
+                     upload_workers: int = LOAD_UPLOAD_WORKERS) -> dict:
+    """Upload DataFrame chunks while the next chunks are still being parsed.
+
+    A producer thread pulls raw chunks from `chunks`, normalizes them (NaN ->
+    None, strings, tuples) and puts batch_size-row batches on a bounded queue.
+    upload_workers threads each take batches off the queue and send them with
+    their own cursor, so several executemany() calls are in flight at once.
+    If any thread fails, the others stop and the first error is raised.
+
+    Args:
+        client: An active SnowflakeClient connection.
+        qualified_table: e.g. 'FINFLOW.RAW."TRANS"'.
+        columns: Column names, in the order of each chunk's columns.
+        chunks: Iterable of raw DataFrames (e.g. read_csv_chunks()).
+        batch_size: Rows sent per executemany() round trip.
+        queue_depth: Batches that may wait between producer and uploaders.
+        upload_workers: executemany() calls allowed in flight at once.
+
+    Returns:
+        {"rows", "wall_sec", "parse_busy_sec", "parse_idle_sec",
+         "upload_busy_sec", "upload_idle_sec", "upload_workers", "bottleneck"}
+        Idle time is time spent waiting on the queue; upload times are summed
+        over all upload threads.
+    """
+    insert_sql = insert_statement(qualified_table, columns)
+    batches = queue.Queue(maxsize=queue_depth)
+    failed = threading.Event()
+    errors = []
+    lock = threading.Lock()
+    stats = {"rows": 0, "parse_busy_sec": 0.0, "parse_idle_sec": 0.0,
+             "upload_busy_sec": 0.0, "upload_idle_sec": 0.0}
+
+    # Queue waits poll so a failure on the other side can't leave a thread blocked forever
+    def put(item) -> bool:
+        while not failed.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def get():
+        while not failed.is_set():
+            try:
+                return batches.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return _DONE
+
+    def produce():
+        try:
+            for chunk in _timed_iter(chunks, stats, "parse_busy_sec"):
+                start = time.perf_counter()
+                rows = build_rows(stringify_values(replace_nan(chunk)))
+                stats["parse_busy_sec"] += time.perf_counter() - start
+
+                for i in range(0, len(rows), batch_size):
+                    start = time.perf_counter()
+                    if not put(rows[i:i + batch_size]):
+                        return
+                    stats["parse_idle_sec"] += time.perf_counter() - start
+        except Exception as e:
+            errors.append(e)
+            failed.set()
+        finally:
+            for _ in range(upload_workers):
+                put(_DONE)
+
+    def upload():
+        cursor = client.conn.cursor()
+        try:
+            while True:
+                start = time.perf_counter()
+                batch = get()
+                waited = time.perf_counter() - start
+                if batch is _DONE:
+                    break
+
+                start = time.perf_counter()
+                cursor.executemany(insert_sql, batch)
+                busy = time.perf_counter() - start
+
+                with lock:
+                    stats["upload_idle_sec"] += waited
+                    stats["upload_busy_sec"] += busy
+                    before = stats["rows"]
+                    stats["rows"] += len(batch)
+                    if stats["rows"] // PROGRESS_EVERY_ROWS > before // PROGRESS_EVERY_ROWS:
+                        logger.info("  %s: %d rows loaded", qualified_table, stats["rows"])
+        except Exception as e:
+            errors.append(e)
+            failed.set()
+        finally:
+            cursor.close()
+
+    wall_start = time.perf_counter()
+    threads = [threading.Thread(target=produce, name="load-parse", daemon=True)]
+    threads += [threading.Thread(target=upload, name=f"load-upload-{i}", daemon=True)
+                for i in range(upload_workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats["wall_sec"] = time.perf_counter() - wall_start
+
+    if errors:
+        raise errors[0]
+
+    # Whichever side spent the larger share of its time waiting is NOT the bottleneck
+    wall = stats["wall_sec"] or 1e-9
+    parse_idle_share = stats["parse_idle_sec"] / wall
+    upload_idle_share = stats["upload_idle_sec"] / (wall * upload_workers)
+    stats["bottleneck"] = "upload" if parse_idle_share > upload_idle_share else "parse"
+    stats["upload_workers"] = upload_workers
+    logger.info(
+        "  %s: parse busy %.2fs, idle %.2fs (queue full) | upload busy %.2fs, idle %.2fs "
+        "(queue empty, %d worker(s)) | bottleneck: %s",
+        qualified_table, stats["parse_busy_sec"], stats["parse_idle_sec"],
+        stats["upload_busy_sec"], stats["upload_idle_sec"], upload_workers, stats["bottleneck"],
+    )
+    return stats
+
+
+def load_csv_to_snowflake(client: SnowflakeClient, csv_path: Path, table_name: str,
+                          batch_size: int = BATCH_SIZE, chunk_rows: int = LOAD_CHUNK_ROWS,
+                          queue_depth: int = LOAD_QUEUE_DEPTH,
+                          upload_workers: int = LOAD_UPLOAD_WORKERS,
+                          use_cache: bool = USE_CSV_CACHE, cache_dir: Path = CSV_CACHE_DIR,
+                          sort_by: list[str] = None) -> dict:
+    """Load a single CSV file into a Snowflake RAW table.
+
+    Strategy: TRUNCATE + batch INSERT using executemany().
+    We send rows in chunks of 1000 for efficiency, and parse the next chunk
+    of the file while earlier batches are uploading (see pipelined_insert).
+
+    Each stage (read, NaN replacement, stringify, tuple building, insert) is its
+    own function so src/perf/loader_benchmarks.py can time them separately.
+
+    Args:
+        client: An active SnowflakeClient connection.
+        csv_path: Path to the CSV file.
+        table_name: The Snowflake table name to load into (e.g., "ACCOUNT").
+        batch_size: Rows sent per executemany() round trip.
+        chunk_rows: Rows parsed from the file at a time.
+        queue_depth: Parsed batches allowed to wait for an uploader.
+        upload_workers: executemany() calls in flight at once.
+        use_cache: Read the CSV's columnar cache instead of parsing it (see csv_cache.py).
+        cache_dir: Where cache files live.
+        sort_by: Upload rows sorted by these columns (None = file order).
+
+    Returns:
+        The stats dict from pipelined_insert().
+    """
+    sep, columns = read_csv_header(csv_path)
+
+    # Quote the table name in case it's a reserved word (like ORDER)
+    qualified_table = f'FINFLOW.{SCHEMA_RAW}."{table_name}"'
+
+    # Truncate for idempotency (safe to re-run)
+    logger.info("Truncating %s ...", qualified_table)
+    client.execute(f'TRUNCATE TABLE {qualified_table}')
+
+    logger.info("Loading %s (chunks of %d rows, queue depth %d, %d upload worker(s))",
+                csv_path.name, chunk_rows, queue_depth, upload_workers)
+    parse = partial(read_csv_chunks, sep=sep)
+    variant = ""
+    if sort_by:
+        parse = partial(read_sorted_csv_chunks, sort_by=list(sort_by), sep=sep,
+                        spill_dir=cache_dir if use_cache else None)
+        variant = "sorted by " + ", ".join(sort_by)
+    if use_cache:
+        # The cache stores rows already sorted, so later loads skip parsing AND sorting
+        chunks = cached_chunks(csv_path, chunk_rows, parse, cache_dir, variant)
+    else:
+        chunks = parse(csv_path, chunk_rows)
+    stats = pipelined_insert(client, qualified_table, columns, chunks,
+                             batch_size, queue_depth, upload_workers)
+    logger.info("Loaded %d rows into %s in %.2f sec", stats["rows"], qualified_table, stats["wall_sec"])
+    return stats
 
 
 def load_all_csvs(client: SnowflakeClient):
@@ -113,6 +438,6 @@ def load_all_csvs(client: SnowflakeClient):
 
     for csv_path in csv_files:
         table_name = csv_path.stem.upper()
-        load_csv_to_snowflake(client, csv_path, table_name)
+        load_csv_to_snowflake(client, csv_path, table_name, sort_by=LOAD_SORT_KEYS.get(table_name))
 
     logger.info("All CSV files loaded into RAW schema.")
@@ -0,0 +1,167 @@
+"""
+warehouse_manager.py — Applies per-stage warehouse sizing and suspends compute at the end.
+
+HIGH-LEVEL EXPLANATION:
+    A bulk load, a 1M-row transform and sub-second quality checks have very
+    different compute needs, but by default they all run on FINFLOW_XS.
+    WarehouseManager wraps each pipeline stage and applies that stage's
+    profile from config.get_warehouse_profiles():
+
+      Before the stage:  USE WAREHOUSE <name>            (if the stage has its own)
+                         SHOW WAREHOUSES LIKE '<name>'   (first use only: its real size)
+                         ALTER WAREHOUSE ... SET WAREHOUSE_SIZE = <size>
+      After the stage:   ALTER WAREHOUSE ... SET WAREHOUSE_SIZE = <scale_down>
+                         (or, by default, back to the size it had before)
+      End of pipeline:   ALTER WAREHOUSE ... SUSPEND     (every warehouse used)
+
+    It only issues an ALTER when the size actually changes, and for every
+    stage it logs the time taken and the estimated credits, next to what the
+    same time would have cost at the warehouse's own size — so you can see
+    whether scaling up paid for itself.
+
+    Usage:
+        warehouses = WarehouseManager(client, sf_config["warehouse"], get_warehouse_profiles())
+        with warehouses.stage("transform"):
+            build_analytics_tables(client)
+        warehouses.suspend_all()
+
+WHY THIS MATTERS AT RBC:
+    Snowflake bills per second of running warehouse, and each size up doubles
+    the rate. Right-sizing each step (and never leaving compute idling) is
+    one of the easiest cost wins on any warehouse bill.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+
+from src.config import WAREHOUSE_CREDITS_PER_HOUR
+from src.load.snowflake_client import SnowflakeClient
+
+logger = logging.getLogger("finflow.warehouse")
+
+
+# Used when SHOW WAREHOUSES doesn't return a size we recognise
+FALLBACK_SIZE = "XSMALL"
+
+# SHOW WAREHOUSES spells sizes differently from ALTER WAREHOUSE ... SET WAREHOUSE_SIZE
+SHOWN_SIZE_ALIASES = {"2XLARGE": "XXLARGE", "3XLARGE": "XXXLARGE", "4XLARGE": "X4LARGE",
+                      "5XLARGE": "X5LARGE", "6XLARGE": "X6LARGE"}
+
+
+def estimate_credits(size: str, seconds: float) -> float:
+    """Credits a warehouse of this size uses while running for `seconds`."""
+    return WAREHOUSE_CREDITS_PER_HOUR[size] * seconds / 3600
+
+
+def normalize_size(shown: str) -> str:
+    """Turn a size as SHOW WAREHOUSES prints it ("X-Small", "2X-Large") into the ALTER form."""
+    size = str(shown).upper().replace("-", "").replace(" ", "")
+    return SHOWN_SIZE_ALIASES.get(size, size)
+
+
+class WarehouseManager:
+    """Tracks which warehouse/size is active and applies per-stage profiles."""
+
+    def __init__(self, client: SnowflakeClient, default_warehouse: str, profiles: dict):
+        """
+        Args:
+            client: An active SnowflakeClient (or a stand-in with .execute()).
+            default_warehouse: Warehouse from the connection config.
+            profiles: {stage: profile} from config.get_warehouse_profiles().
+        """
+        self.client = client
+        self.default_warehouse = default_warehouse
+        self.profiles = profiles
+        self.current_warehouse = default_warehouse
+        # Last size we know each warehouse runs at, read from Snowflake on first use
+        self.sizes = {}
+        # Warehouses whose size couldn't be read (FALLBACK_SIZE is only a guess for them)
+        self.unknown_sizes = set()
+        self.used = [default_warehouse]
+        self.stage_results = []
+
+    def _use(self, warehouse: str):
+        if warehouse != self.current_warehouse:
+            self.client.execute(f"USE WAREHOUSE {warehouse}")
+            self.current_warehouse = warehouse
+            if warehouse not in self.used:
+                self.used.append(warehouse)
+
+    def _size(self, warehouse: str) -> str:
+        """The warehouse's current size, asking Snowflake the first time it's needed."""
+        if warehouse not in self.sizes:
+            rows = self.client.execute(f"SHOW WAREHOUSES LIKE '{warehouse}'")
+            # LIKE treats "_" as a wildcard, so pick the exact name; size is the 4th column
+            row = next((r for r in rows if str(r[0]).upper() == warehouse.upper()), None)
+            size = normalize_size(row[3]) if row else None
+            if size not in WAREHOUSE_CREDITS_PER_HOUR:
+                logger.warning("Could not read the size of warehouse %s — assuming %s",
+                               warehouse, FALLBACK_SIZE)
+                size = FALLBACK_SIZE
+                self.unknown_sizes.add(warehouse)
+            self.sizes[warehouse] = size
+        return self.sizes[warehouse]
+
+    def _resize(self, size: str):
+        warehouse = self.current_warehouse
+        if self._size(warehouse) == size:
+            return
+        logger.info("Resizing %s: %s -> %s", warehouse, self.sizes[warehouse], size)
+        self.client.execute(
+            f"ALTER WAREHOUSE {warehouse} SET WAREHOUSE_SIZE = '{size}' WAIT_FOR_COMPLETION = TRUE"
+        )
+        self.sizes[warehouse] = size
+
+    @contextmanager
+    def stage(self, name: str):
+        """Run the body of the `with` block on this stage's compute profile."""
+        profile = self.profiles.get(name, {})
+        self._use(profile.get("warehouse") or self.default_warehouse)
+        warehouse = self.current_warehouse
+        original_size = self._size(warehouse)
+        if profile.get("size"):
+            self._resize(profile["size"])
+
+        size = self.sizes[warehouse]
+        start = time.time()
+        try:
+            yield
+        finally:
+            elapsed = time.time() - start
+            credits = estimate_credits(size, elapsed)
+            baseline = estimate_credits(original_size, elapsed)
+            self.stage_results.append({
+                "stage": name, "warehouse": warehouse, "size": size,
+                "duration_sec": round(elapsed, 3), "credits": credits,
+            })
+            logger.info(
+                "Stage %-10s %8.1f sec on %s (%s) ~ %.4f credits "
+                "(%s would cost %.4f for the same time; break-even at %.0fx faster)",
+                name, elapsed, warehouse, size, credits, original_size, baseline,
+                WAREHOUSE_CREDITS_PER_HOUR[size] / WAREHOUSE_CREDITS_PER_HOUR[original_size],
+            )
+
+            # Without an explicit scale_down, hand the warehouse back the way we found it
+            if profile.get("scale_down"):
+                self._resize(profile["scale_down"])
+            elif warehouse in self.unknown_sizes and size != original_size:
+                logger.warning("Leaving %s at %s — its original size is unknown", warehouse, size)
+            else:
+                self._resize(original_size)
+
+    def suspend_all(self):
+        """Suspend every warehouse the pipeline touched.
+
+        A warehouse that is already suspended makes Snowflake raise an error,
+        which is harmless here, so it's logged and skipped.
+        """
+        for warehouse in self.used:
+            try:
+                self.client.execute(f"ALTER WAREHOUSE {warehouse} SUSPEND")
+                logger.info("Suspended warehouse %s", warehouse)
+            except Exception as e:
+                logger.warning("Could not suspend %s (probably already suspended): %s", warehouse, e)
+
+        total = sum(r["credits"] for r in self.stage_results)
+        logger.info("Estimated compute across all stages: %.4f credits", total)
@@ -0,0 +1,104 @@
+"""
+api_benchmarks.py — Measures p50/p99 latency of the account statement API.
+
+HIGH-LEVEL EXPLANATION:
+    Averages hide the slow requests users actually notice, so this reports
+    percentiles. For a sample of accounts it times three kinds of lookup:
+
+      cold       first page, not in the cache (a real warehouse round trip)
+      next_page  second page via the keyset cursor (also a round trip)
+      warm       first page again — served from the per-account LRU cache
+
+    The target is double-digit milliseconds for warm lookups.
+
+    Usage:
+        python -m src.perf.api_benchmarks
+        python -m src.perf.api_benchmarks --accounts 200 --pool-size 8 --page-size 50
+
+WHY THIS MATTERS AT RBC:
+    Latency SLAs are written as percentiles ("p99 under 100ms"), not
+    averages. If you can't measure p99 you can't promise it.
+"""
+
+import argparse
+import logging
+import math
+import time
+from datetime import date
+
+from src.api.account_statements import AccountStatementAPI, ConnectionPool
+from src.config import get_snowflake_config
+
+logger = logging.getLogger("finflow.api_benchmarks")
+
+DEFAULT_START = date(1993, 1, 1)
+DEFAULT_END = date(1998, 12, 31)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile (pct between 0 and 100)."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def sample_accounts(api: AccountStatementAPI, n: int) -> list[int]:
+    """Pick n random account keys from DIM_ACCOUNT."""
+    with api.pool.connection() as conn:
+        # Pool connections bind ? server-side, and SAMPLE's row count must be a literal
+        conn["cursor"].execute(f"SELECT ACCOUNT_KEY FROM FINFLOW.ANALYTICS.DIM_ACCOUNT SAMPLE ({int(n)} ROWS)")
+        return [r[0] for r in conn["cursor"].fetchall()]
+
+
+def run_api_benchmark(api: AccountStatementAPI, account_keys: list[int],
+                      start_date: date = DEFAULT_START, end_date: date = DEFAULT_END) -> dict:
+    """Time cold, next-page and warm lookups for each account.
+
+    Returns:
+        {"cold": {"p50_ms", "p99_ms", "n"}, "next_page": {...}, "warm": {...}}
+    """
+    logger.info("=== Running Account Statement API Benchmark (%d accounts) ===", len(account_keys))
+    api.invalidate()
+    timings = {"cold": [], "next_page": [], "warm": []}
+
+    def timed(kind, *args):
+        start = time.perf_counter()
+        page = api.get_page(*args)
+        timings[kind].append((time.perf_counter() - start) * 1000)
+        return page
+
+    for account_key in account_keys:
+        first = timed("cold", account_key, start_date, end_date)
+        if first["next_cursor"] is not None:
+            timed("next_page", account_key, start_date, end_date, first["next_cursor"])
+        timed("warm", account_key, start_date, end_date)
+
+    summary = {}
+    for kind, values in timings.items():
+        summary[kind] = {
+            "p50_ms": round(percentile(values, 50), 2),
+            "p99_ms": round(percentile(values, 99), 2),
+            "n": len(values),
+        }
+        logger.info("%-10s p50 %8.2f ms   p99 %8.2f ms   (n=%d)",
+                    kind, summary[kind]["p50_ms"], summary[kind]["p99_ms"], len(values))
+
+    logger.info("=== API benchmark complete (cache hits=%d, misses=%d) ===", api.hits, api.misses)
+    return summary
+
+
+if __name__ == "__main__":
+    from src.logging_config import setup_logging
+    setup_logging()
+
+    parser = argparse.ArgumentParser(description="Benchmark account statement lookups.")
+    parser.add_argument("--accounts", type=int, default=100, help="Accounts to sample")
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    with ConnectionPool(get_snowflake_config(), size=args.pool_size) as pool:
+        statement_api = AccountStatementAPI(pool, page_size=args.page_size)
+        run_api_benchmark(statement_api, sample_accounts(statement_api, args.accounts))
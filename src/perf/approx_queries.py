@@ -0,0 +1,285 @@
+"""
+approx_queries.py — Interactive mode: run the demo queries on a sample, with error bars.
+
+HIGH-LEVEL EXPLANATION:
+    For exploring the data ("which region has the most volume?") an answer
+    that is 2% off in a fraction of the time is usually good enough. This
+    module rewrites each query in 05_demo_queries.sql to run approximately:
+
+      sample mode (default)
+        FCT_TRANSACTIONS f  ->  FCT_TRANSACTIONS f SAMPLE BERNOULLI (rate)
+        COUNT(...)          ->  ROUND(COUNT(...) / fraction)   (scaled back up)
+        SUM(...)            ->  (SUM(...) / fraction)
+        COUNT(DISTINCT x)   ->  APPROX_COUNT_DISTINCT(x)
+        + a SAMPLED_ROWS column: how many sampled rows each group is based on
+
+      approx mode
+        Full table, but COUNT(DISTINCT x) -> APPROX_COUNT_DISTINCT(x)
+        (HyperLogLog: ~1.6% typical error, much less memory than exact)
+
+    ERROR ESTIMATES: with row sampling at fraction p, a group built from n
+    sampled rows has a count whose relative standard error is sqrt((1-p)/n).
+    Each result row carries a 95% margin (1.96x that). Sums and averages
+    vary at least as much as the count, so treat the margin as a lower bound
+    for them.
+
+    COMPARE: run exact and approximate side by side at several rates and
+    write reports/approx_queries.md — speedup vs. measured error per query.
+
+    Usage:
+        python -m src.perf.approx_queries --rate 10                 # print sampled answers
+        python -m src.perf.approx_queries --mode approx
+        python -m src.perf.approx_queries --compare --rates 1 5 10 25
+
+WHY THIS MATTERS AT RBC:
+    Exploration is where analysts burn the most compute on the least
+    important answers. Knowing how wrong a sample can be, per query, is what
+    makes it safe to use one.
+"""
+
+import argparse
+import logging
+import math
+import re
+import statistics
+import time
+from pathlib import Path
+
+from src.config import PROJECT_ROOT, get_snowflake_config
+from src.load.snowflake_client import SnowflakeClient
+from src.perf.run_benchmarks import load_demo_queries
+
+logger = logging.getLogger("finflow.approx_queries")
+
+DEFAULT_RATE = 10.0
+DEFAULT_COMPARE_RATES = (1.0, 5.0, 10.0, 25.0)
+DEFAULT_REPORT_PATH = PROJECT_ROOT / "reports" / "approx_queries.md"
+SAMPLING_METHODS = ("BERNOULLI", "SYSTEM")
+
+# Snowflake documents ~1.62% average relative error for APPROX_COUNT_DISTINCT
+HLL_RELATIVE_ERROR_PCT = 1.62
+Z_95 = 1.96
+
+FACT_TABLE_RE = re.compile(r"FINFLOW\.ANALYTICS\.FCT_TRANSACTIONS f\b")
+COUNT_DISTINCT_RE = re.compile(r"\bCOUNT\(\s*DISTINCT\s+([^()]+)\)", flags=re.IGNORECASE)
+COUNT_RE = re.compile(r"\bCOUNT\((\*|[\w.]+)\)", flags=re.IGNORECASE)
+SUM_RE = re.compile(r"\bSUM\(([^()]+)\)", flags=re.IGNORECASE)
+GROUP_BY_RE = re.compile(r"\bGROUP BY\s+(.+?)\s*(?:\bORDER BY\b|\bLIMIT\b|$)", flags=re.DOTALL)
+
+
+def rewrite_query(sql: str, rate: float = None, method: str = "BERNOULLI", seed: int = None) -> str:
+    """Rewrite one demo query to run approximately.
+
+    Args:
+        sql: The exact query.
+        rate: Sampling rate in percent (0-100]. None = approx mode (no sampling).
+        method: BERNOULLI (each row, accurate) or SYSTEM (whole micro-partitions, faster
+                but rows in a partition are correlated, so the margins understate the error).
+        seed: Make the sample repeatable.
+    """
+    sql = COUNT_DISTINCT_RE.sub(r"APPROX_COUNT_DISTINCT(\1)", sql)
+    if rate is None:
+        return sql
+
+    if not 0 < rate <= 100:
+        raise ValueError(f"Sampling rate must be in (0, 100], got {rate}")
+    if method.upper() not in SAMPLING_METHODS:
+        raise ValueError(f"Sampling method must be one of {SAMPLING_METHODS}, got {method!r}")
+
+    fraction = rate / 100
+    sql = COUNT_RE.sub(lambda m: f"ROUND({m.group(0)} / {fraction})", sql)
+    sql = SUM_RE.sub(lambda m: f"({m.group(0)} / {fraction})", sql)
+    sample = f" SAMPLE {method.upper()} ({rate:g})" + (f" SEED ({seed})" if seed is not None else "")
+    sql = FACT_TABLE_RE.sub(lambda m: m.group(0) + sample, sql)
+    # Unscaled row count per group — what the error estimate is based on
+    return re.sub(r"^SELECT\b", "SELECT\n    COUNT(*) AS SAMPLED_ROWS,", sql, count=1, flags=re.MULTILINE)
+
+
+def group_key_count(sql: str) -> int:
+    """How many leading result columns identify a group (the GROUP BY expressions)."""
+    match = GROUP_BY_RE.search(sql)
+    return len(match.group(1).split(",")) if match else 0
+
+
+def margin_pct(sampled_rows: int, rate: float) -> float:
+    """95% relative margin of error (in %) for a count estimated from sampled_rows rows."""
+    if rate >= 100:
+        return 0.0
+    if not sampled_rows:
+        return float("inf")
+    return 100 * Z_95 * math.sqrt((1 - rate / 100) / sampled_rows)
+
+
+def timed_execute(client: SnowflakeClient, sql: str, runs: int) -> tuple[list, float]:
+    """Run sql `runs` times; return (rows of the last run, median ms)."""
+    timings, rows = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        rows = client.execute(sql)
+        timings.append((time.perf_counter() - start) * 1000)
+    return rows, statistics.median(timings)
+
+
+def run_approx_queries(client: SnowflakeClient, rate: float = DEFAULT_RATE, mode: str = "sample",
+                       method: str = "BERNOULLI", seed: int = None, runs: int = 1) -> list[dict]:
+    """Run every demo query approximately.
+
+    Returns:
+        One dict per query: {"query", "sql", "ms", "rows", "margins_pct"}.
+        In sample mode, rows no longer include the SAMPLED_ROWS column; each
+        row's 95% margin is in margins_pct. In approx mode the margin is the
+        HyperLogLog error for queries that count distinct values, else 0.
+    """
+    if mode not in ("sample", "approx"):
+        raise ValueError(f"mode must be 'sample' or 'approx', got {mode!r}")
+
+    results = []
+    for name, exact_sql in load_demo_queries():
+        sql = rewrite_query(exact_sql, rate if mode == "sample" else None, method, seed)
+        rows, ms = timed_execute(client, sql, runs)
+
+        if mode == "sample":
+            margins = [margin_pct(row[0], rate) for row in rows]
+            rows = [tuple(row[1:]) for row in rows]
+        else:
+            hll = HLL_RELATIVE_ERROR_PCT * Z_95 if COUNT_DISTINCT_RE.search(exact_sql) else 0.0
+            margins = [hll] * len(rows)
+
+        results.append({"query": name, "sql": sql, "ms": ms, "rows": rows, "margins_pct": margins})
+    return results
+
+
+def compare_results(exact_rows: list, approx_rows: list, key_count: int, margins_pct: list) -> dict:
+    """Measure how far approximate rows are from the exact ones, group by group.
+
+    Groups are matched on their first key_count columns. Every other numeric
+    column is compared by relative error.
+
+    Returns:
+        {"groups", "matched", "median_error_pct", "max_error_pct", "within_margin_pct"}
+    """
+    exact_by_key = {tuple(row[:key_count]): row for row in exact_rows}
+    errors, within = [], []
+
+    for row, margin in zip(approx_rows, margins_pct):
+        exact = exact_by_key.get(tuple(row[:key_count]))
+        if exact is None:
+            continue
+        for approx_value, exact_value in zip(row[key_count:], exact[key_count:]):
+            try:
+                approx_value, exact_value = float(approx_value), float(exact_value)
+            except (TypeError, ValueError):
+                continue
+            if exact_value == 0 or math.isnan(exact_value):
+                continue
+            error = 100 * abs(approx_value - exact_value) / abs(exact_value)
+            errors.append(error)
+            within.append(error <= margin)
+
+    matched = sum(1 for row in approx_rows if tuple(row[:key_count]) in exact_by_key)
+    return {
+        "groups": len(exact_rows),
+        "matched": matched,
+        "median_error_pct": round(statistics.median(errors), 2) if errors else None,
+        "max_error_pct": round(max(errors), 2) if errors else None,
+        "within_margin_pct": round(100 * sum(within) / len(within)) if within else None,
+    }
+
+
+def write_report(path: Path, method: str, comparisons: list[dict]):
+    """Write speedup vs. accuracy for every (rate, query) as a markdown report."""
+    lines = [
+        "# Approximate Demo Queries — Speedup vs Accuracy",
+        "",
+        f"Run at {time.strftime('%Y-%m-%d %H:%M')}, sampling method {method}. Times are medians in ms.",
+        "Errors are relative to the exact result, over every numeric cell of the groups",
+        "both runs returned. \"Within margin\" is the share of cells inside the row's 95% estimate.",
+        "",
+        "| Mode | Query | Exact ms | Approx ms | Speedup | Groups matched | Median err % | Max err % | Within margin |",
+        "|------|-------|----------|-----------|---------|----------------|--------------|-----------|---------------|",
+    ]
+    def show(value, suffix=""):
+        return "-" if value is None else f"{value}{suffix}"
+
+    for c in comparisons:
+        lines.append(
+            f"| {c['mode']} | {c['query']} | {c['exact_ms']:.0f} | {c['approx_ms']:.0f} | "
+            f"{c['speedup']:.1f}x | {c['matched']}/{c['groups']} | {show(c['median_error_pct'])} | "
+            f"{show(c['max_error_pct'])} | {show(c['within_margin_pct'], '%')} |"
+        )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines) + "\n")
+    logger.info("Report written to %s", path)
+
+
+def compare_with_exact(client: SnowflakeClient, rates=DEFAULT_COMPARE_RATES, method: str = "BERNOULLI",
+                       seed: int = None, runs: int = 3,
+                       report_path: Path = DEFAULT_REPORT_PATH) -> list[dict]:
+    """Run the demo queries exactly, in approx mode, and sampled at each rate; report speedup vs error.
+
+    Returns:
+        One dict per (mode, query) with timings and the compare_results() fields.
+    """
+    logger.info("=== Approximate vs Exact Demo Queries (rates: %s) ===", ", ".join(f"{r:g}%" for r in rates))
+    client.execute("ALTER SESSION SET USE_CACHED_RESULT = FALSE")
+    try:
+        exact = {}
+        for name, sql in load_demo_queries():
+            exact[name] = (sql, *timed_execute(client, sql, runs))
+
+        runs_by_mode = [("approx", run_approx_queries(client, mode="approx", runs=runs))]
+        for rate in rates:
+            runs_by_mode.append(
+                (f"sample {rate:g}%", run_approx_queries(client, rate, "sample", method, seed, runs))
+            )
+    finally:
+        client.execute("ALTER SESSION UNSET USE_CACHED_RESULT")
+
+    comparisons = []
+    for mode, results in runs_by_mode:
+        for r in results:
+            exact_sql, exact_rows, exact_ms = exact[r["query"]]
+            accuracy = compare_results(exact_rows, r["rows"], group_key_count(exact_sql), r["margins_pct"])
+            comparisons.append({
+                "mode": mode, "query": r["query"], "exact_ms": exact_ms, "approx_ms": r["ms"],
+                "speedup": exact_ms / r["ms"] if r["ms"] else float("inf"), **accuracy,
+            })
+            logger.info("%-12s %-45s %6.1fx faster, median error %s%%", mode, r["query"][:45],
+                        comparisons[-1]["speedup"], accuracy["median_error_pct"])
+
+    write_report(report_path, method, comparisons)
+    logger.info("=== Approximate query comparison complete ===")
+    return comparisons
+
+
+def log_results(results: list[dict]):
+    """Print approximate answers with their 95% margins."""
+    for r in results:
+        logger.info("--- %s (%.0f ms) ---", r["query"], r["ms"])
+        for row, margin in zip(r["rows"], r["margins_pct"]):
+            values = ", ".join(str(v) for v in row)
+            logger.info("  %s   (±%.1f%%)", values, margin)
+
+
+if __name__ == "__main__":
+    from src.logging_config import setup_logging
+    setup_logging()
+
+    parser = argparse.ArgumentParser(description="Run the demo queries approximately.")
+    parser.add_argument("--mode", choices=("sample", "approx"), default="sample")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="Sampling rate in percent")
+    parser.add_argument("--method", choices=SAMPLING_METHODS, default="BERNOULLI")
+    parser.add_argument("--seed", type=int, default=None, help="Repeatable sample")
+    parser.add_argument("--compare", action="store_true",
+                        help="Also run exact queries and write the speedup-vs-accuracy report")
+    parser.add_argument("--rates", type=float, nargs="+", default=list(DEFAULT_COMPARE_RATES))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--report", type=Path, default=DEFAULT_REPORT_PATH)
+    args = parser.parse_args()
+
+    with SnowflakeClient(get_snowflake_config()) as sf_client:
+        if args.compare:
+            compare_with_exact(sf_client, args.rates, args.method, args.seed, args.runs, args.report)
+        else:
+            log_results(run_approx_queries(sf_client, args.rate, args.mode, args.method, args.seed))
@@ -0,0 +1,281 @@
+"""
+clustering_experiment.py — Compares candidate clustering keys on a table, automatically.
+
+HIGH-LEVEL EXPLANATION:
+    docs/05_performance.md describes a manual experiment: cluster
+    FCT_TRANSACTIONS on TRANSACTION_DATE, then on YEAR/MONTH, and hand-time
+    the demo queries. This script does the same thing repeatably:
+
+      0. Benchmark the table as it is today (the baseline)
+      For each candidate key:
+        1. Zero-copy CLONE the table and set the candidate CLUSTER BY on the clone
+        2. Either rebuild the clone in key order (INSERT OVERWRITE ... ORDER BY,
+           fast and deterministic) or wait for automatic reclustering to settle
+        3. Capture SYSTEM$CLUSTERING_INFORMATION (depth, overlaps, partitions)
+        4. SWAP the clone into place, run the demo query benchmark, SWAP back
+        5. Drop the clone
+      Finally: write a markdown report + chart. With --record, the winning key
+      is also written into sql/02_create_analytics_tables.sql. That is off by
+      default: the pipeline writes FCT_TRANSACTIONS in date order instead of
+      keeping a clustering key (see ordering_report.py).
+
+    The original table is never altered — it is only swapped out while a
+    candidate is being benchmarked, and always swapped back (even on error).
+    The query result cache is turned off for the session so every run really
+    scans the table.
+
+    Usage:
+        python -m src.perf.clustering_experiment
+        python -m src.perf.clustering_experiment --key "TRANSACTION_DATE" \\
+            --key "YEAR(TRANSACTION_DATE), MONTH(TRANSACTION_DATE)" --mode wait --runs 5
+
+WHY THIS MATTERS AT RBC:
+    Clustering keys cost credits to maintain, so picking one should be a
+    measured decision you can re-run when the data or the queries change,
+    not a one-off afternoon of copy-pasting timings.
+"""
+
+import argparse
+import json
+import logging
+import re
+import statistics
+import time
+from pathlib import Path
+
+from src.charts.generate_charts import chart_clustering_experiment
+from src.config import PROJECT_ROOT, SQL_DIR, get_snowflake_config
+from src.load.snowflake_client import SnowflakeClient
+from src.perf.run_benchmarks import run_benchmarks
+
+logger = logging.getLogger("finflow.clustering_experiment")
+
+DEFAULT_TABLE = "FINFLOW.ANALYTICS.FCT_TRANSACTIONS"
+DEFAULT_CANDIDATES = (
+    "TRANSACTION_DATE",
+    "YEAR(TRANSACTION_DATE), MONTH(TRANSACTION_DATE)",
+)
+DEFAULT_REPORT_PATH = PROJECT_ROOT / "reports" / "clustering_experiment.md"
+DDL_FILE = SQL_DIR / "02_create_analytics_tables.sql"
+
+# Automatic reclustering: poll until depth reaches the target or stops improving
+WAIT_POLL_SEC = 60
+WAIT_TIMEOUT_SEC = 3600
+WAIT_TARGET_DEPTH = 2.0
+
+
+def get_clustering_info(client: SnowflakeClient, table: str, key: str) -> dict:
+    """Return clustering depth/overlap stats for `table` measured on `key`.
+
+    Works whether or not the table is actually clustered on `key`, which is
+    how we get a "before" number for every candidate.
+    """
+    rows = client.execute(f"SELECT SYSTEM$CLUSTERING_INFORMATION('{table}', '({key})')")
+    info = json.loads(rows[0][0]) if rows and rows[0][0] else {}
+    return {
+        "average_depth": info.get("average_depth"),
+        "average_overlaps": info.get("average_overlaps"),
+        "total_partition_count": info.get("total_partition_count"),
+        "constant_partition_count": info.get("total_constant_partition_count"),
+    }
+
+
+def get_current_clustering_key(client: SnowflakeClient, table: str):
+    """Return the table's clustering key expression, or None if it has none."""
+    database, schema, name = table.split(".")
+    rows = client.execute(
+        f"SELECT CLUSTERING_KEY FROM {database}.INFORMATION_SCHEMA.TABLES "
+        f"WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+        (schema, name),
+    )
+    key = rows[0][0] if rows else None
+    # Snowflake reports keys as LINEAR(col1, col2) — strip the wrapper
+    match = re.fullmatch(r"LINEAR\((.*)\)", key or "", flags=re.DOTALL)
+    return match.group(1) if match else key
+
+
+def wait_for_reclustering(client: SnowflakeClient, table: str, key: str,
+                          timeout_sec: float = WAIT_TIMEOUT_SEC, poll_sec: float = WAIT_POLL_SEC,
+                          target_depth: float = WAIT_TARGET_DEPTH) -> dict:
+    """Poll clustering depth until it reaches target_depth, stops improving, or times out."""
+    deadline = time.time() + timeout_sec
+    info = get_clustering_info(client, table, key)
+    stalled = 0
+
+    while time.time() < deadline:
+        depth = info["average_depth"]
+        if depth is not None and depth <= target_depth:
+            break
+        time.sleep(poll_sec)
+        new_info = get_clustering_info(client, table, key)
+        stalled = stalled + 1 if new_info["average_depth"] == depth else 0
+        info = new_info
+        logger.info("  reclustering %s: average depth %s", table, info["average_depth"])
+        if stalled >= 3:
+            logger.info("  depth stopped improving — moving on")
+            break
+    else:
+        logger.warning("  reclustering timed out after %d sec", timeout_sec)
+
+    return info
+
+
+def benchmark_queries(client: SnowflakeClient, runs: int) -> dict:
+    """Run the demo query benchmark `runs` times; return the median ms per query."""
+    timings = {}
+    for _ in range(runs):
+        for result in run_benchmarks(client):
+            timings.setdefault(result["query"], []).append(result["duration_sec"] * 1000)
+    return {query: round(statistics.median(ms)) for query, ms in timings.items()}
+
+
+def run_candidate(client: SnowflakeClient, table: str, key: str, mode: str, runs: int) -> dict:
+    """Build a clustered clone for one candidate key, benchmark it in place, and clean up."""
+    clone = f"{table}__CK"
+    logger.info("--- Candidate: CLUSTER BY (%s) [%s] ---", key, mode)
+
+    client.execute(f"CREATE OR REPLACE TABLE {clone} CLONE {table}")
+    try:
+        client.execute(f"ALTER TABLE {clone} CLUSTER BY ({key})")
+        start = time.time()
+        if mode == "rebuild":
+            client.execute(f"INSERT OVERWRITE INTO {clone} SELECT * FROM {clone} ORDER BY {key}")
+            info = get_clustering_info(client, clone, key)
+        else:
+            # Clones start with automatic clustering suspended
+            client.execute(f"ALTER TABLE {clone} RESUME RECLUSTER")
+            info = wait_for_reclustering(client, clone, key)
+        prepare_sec = time.time() - start
+
+        client.execute(f"ALTER TABLE {table} SWAP WITH {clone}")
+        try:
+            query_ms = benchmark_queries(client, runs)
+        finally:
+            client.execute(f"ALTER TABLE {table} SWAP WITH {clone}")
+    finally:
+        client.execute(f"DROP TABLE IF EXISTS {clone}")
+
+    return {"key": key, "prepare_sec": round(prepare_sec, 1), **info,
+            "query_ms": query_ms, "total_ms": sum(query_ms.values())}
+
+
+def record_clustering_key(ddl_path: Path, table_name: str, key: str):
+    """Write (or replace) the CLUSTER BY clause for table_name in a CREATE TABLE script."""
+    sql_text = ddl_path.read_text()
+    pattern = re.compile(
+        rf"(CREATE OR REPLACE TABLE {re.escape(table_name)} \(.*?\n\))"
+        rf"(?:\n-- Clustering key picked by [^\n]*)?(?:\nCLUSTER BY \([^\n]*\))?",
+        flags=re.DOTALL,
+    )
+    if not pattern.search(sql_text):
+        raise ValueError(f"No CREATE OR REPLACE TABLE {table_name} found in {ddl_path.name}")
+
+    clause = f"\n-- Clustering key picked by src/perf/clustering_experiment.py\nCLUSTER BY ({key})"
+    ddl_path.write_text(pattern.sub(lambda m: m.group(1) + clause, sql_text, count=1))
+    logger.info("Recorded CLUSTER BY (%s) for %s in %s", key, table_name, ddl_path.name)
+
+
+def write_report(path: Path, table: str, baseline: dict, results: list[dict], winner: dict):
+    """Write the comparison as a markdown report."""
+    queries = list(baseline["query_ms"])
+    lines = [
+        f"# Clustering Key Experiment — {table}",
+        "",
+        f"Run at {time.strftime('%Y-%m-%d %H:%M')}. Query times are medians in ms.",
+        "",
+        "| Key | Avg depth | Avg overlaps | Partitions | " + " | ".join(queries) + " | Total |",
+        "|-----|-----------|--------------|------------|" + "|".join("---" for _ in queries) + "|-------|",
+    ]
+    for r in [baseline] + results:
+        lines.append(
+            f"| {r['key'] or '(baseline)'} | {r['average_depth']} | {r['average_overlaps']} | "
+            f"{r['total_partition_count']} | "
+            + " | ".join(str(r["query_ms"].get(q, "")) for q in queries)
+            + f" | {r['total_ms']} |"
+        )
+    lines.append("")
+    if winner:
+        saved = 100 * (1 - winner["total_ms"] / baseline["total_ms"]) if baseline["total_ms"] else 0
+        lines.append(f"**Winner:** `CLUSTER BY ({winner['key']})` — {saved:.0f}% less total query time than baseline.")
+    else:
+        lines.append("**No candidate beat the baseline** — the DDL was left unchanged.")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines) + "\n")
+    logger.info("Report written to %s", path)
+
+
+def run_clustering_experiment(client: SnowflakeClient, table: str = DEFAULT_TABLE,
+                              candidates=DEFAULT_CANDIDATES, mode: str = "rebuild", runs: int = 3,
+                              report_path: Path = DEFAULT_REPORT_PATH, chart_path: Path = None,
+                              record_winner: bool = False) -> dict:
+    """Benchmark the table as-is and with each candidate clustering key.
+
+    Args:
+        client: An active SnowflakeClient connection.
+        table: Fully qualified table name (DATABASE.SCHEMA.TABLE).
+        candidates: Clustering key expressions to try.
+        mode: "rebuild" (INSERT OVERWRITE in key order) or "wait" (automatic reclustering).
+        runs: Times to run the demo queries per candidate (median is reported).
+        report_path: Where to write the markdown report.
+        chart_path: Where to save the comparison chart (charts/ by default).
+        record_winner: Write the winning key into the DDL script (off by default,
+                       since the DDL deliberately has no CLUSTER BY).
+
+    Returns:
+        {"baseline": {...}, "results": [...], "winner": {...} or None}
+    """
+    if mode not in ("rebuild", "wait"):
+        raise ValueError(f"mode must be 'rebuild' or 'wait', got {mode!r}")
+
+    logger.info("=== Clustering Key Experiment on %s ===", table)
+    client.execute("ALTER SESSION SET USE_CACHED_RESULT = FALSE")
+    try:
+        original_key = get_current_clustering_key(client, table)
+        logger.info("Current clustering key: %s", original_key or "(none)")
+
+        baseline = {"key": None, "prepare_sec": 0.0,
+                    **get_clustering_info(client, table, original_key or candidates[0]),
+                    "query_ms": benchmark_queries(client, runs)}
+        baseline["total_ms"] = sum(baseline["query_ms"].values())
+
+        results = [run_candidate(client, table, key, mode, runs) for key in candidates]
+    finally:
+        client.execute("ALTER SESSION UNSET USE_CACHED_RESULT")
+
+    best = min(results, key=lambda r: r["total_ms"]) if results else None
+    winner = best if best and best["total_ms"] < baseline["total_ms"] else None
+
+    for r in [baseline] + results:
+        logger.info("%-55s depth=%-8s total=%d ms", r["key"] or "(baseline)",
+                    r["average_depth"], r["total_ms"])
+
+    write_report(report_path, table, baseline, results, winner)
+    chart_clustering_experiment(baseline, results, chart_path)
+
+    if winner and record_winner:
+        record_clustering_key(DDL_FILE, table.split(".")[-1], winner["key"])
+
+    logger.info("=== Clustering experiment complete ===")
+    return {"baseline": baseline, "results": results, "winner": winner}
+
+
+if __name__ == "__main__":
+    from src.logging_config import setup_logging
+    setup_logging()
+
+    parser = argparse.ArgumentParser(description="Compare candidate clustering keys.")
+    parser.add_argument("--table", default=DEFAULT_TABLE)
+    parser.add_argument("--key", action="append", dest="keys",
+                        help="Candidate clustering key (repeatable)")
+    parser.add_argument("--mode", choices=("rebuild", "wait"), default="rebuild")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--report", type=Path, default=DEFAULT_REPORT_PATH)
+    parser.add_argument("--record", action="store_true",
+                        help="Write the winner into the DDL as a CLUSTER BY (replaces load-time ordering)")
+    args = parser.parse_args()
+
+    with SnowflakeClient(get_snowflake_config()) as sf_client:
+        run_clustering_experiment(sf_client, args.table, args.keys or DEFAULT_CANDIDATES,
+                                  args.mode, args.runs, args.report,
+                                  record_winner=args.record)
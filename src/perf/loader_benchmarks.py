@@ -0,0 +1,219 @@
+"""
+loader_benchmarks.py — Measures the client-side cost of the RAW loader, stage by stage.
+
+HIGH-LEVEL EXPLANATION:
+    run_benchmarks.py times warehouse queries, but most of the ~22 minute load
+    is spent in Python before and between network calls. This suite runs the
+    same stage functions load_raw.py uses, against a RecordingClient with a
+    simulated round-trip latency, so no Snowflake account is needed:
+
+      parse        read_csv_chunks(): chunked pd.read_csv as strings + column normalization
+      cache_read   reading the same file back from its columnar cache (csv_cache.py)
+      nan_replace  NaN -> None (on the string columns the loader actually sees)
+      stringify    per-cell str() + strip
+      tuples       DataFrame -> list of tuples
+      upload       batching + executemany() round trips
+      pipelined    the real load_csv_to_snowflake(): parse and upload overlapped,
+                   several uploads in flight (compare with the sum of the above)
+
+    For every file size x batch size it reports rows/sec, wall time, CPU time
+    and peak memory per stage. Input files come from the synthetic generator,
+    so a given seed always benchmarks identical data.
+
+    Usage:
+        python -m src.perf.loader_benchmarks
+        python -m src.perf.loader_benchmarks --scales 0.01 0.1 1 --batch-sizes 1000 10000 --latency 0.05
+        python -m src.perf.loader_benchmarks --upload-workers 8 --queue-depth 32
+
+WHY THIS MATTERS AT RBC:
+    "It feels faster" isn't evidence. Comparing loader changes needs the same
+    input, the same simulated network, and numbers per stage, so you know
+    which part a change actually moved.
+"""
+
+import argparse
+import json
+import logging
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+from pathlib import Path
+
+import pandas as pd
+
+from src.generate.generate_berka import generate_dataset
+from src.config import LOAD_CHUNK_ROWS, LOAD_QUEUE_DEPTH, LOAD_UPLOAD_WORKERS
+from src.load.csv_cache import cached_chunks
+from src.load.load_raw import (
+    read_csv_chunks, replace_nan, stringify_values, build_rows, insert_rows,
+    load_csv_to_snowflake,
+)
+from src.perf.recording_client import RecordingClient
+
+logger = logging.getLogger("finflow.loader_benchmarks")
+
+DEFAULT_SCALES = (0.01, 0.1)
+DEFAULT_BATCH_SIZES = (1000, 5000, 16384)
+DEFAULT_LATENCY_SEC = 0.02
+
+
+def measure_stage(fn, *args, trace_memory: bool = True):
+    """Run fn(*args) and measure it.
+
+    Timing and memory are measured in separate runs, because tracemalloc
+    slows allocation-heavy code (like pandas) down a lot.
+
+    Returns:
+        (result, {"wall_sec", "cpu_sec", "peak_mb"})
+    """
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    result = fn(*args)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    peak_mb = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            fn(*args)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1_048_576
+        finally:
+            tracemalloc.stop()
+
+    return result, {"wall_sec": wall, "cpu_sec": cpu, "peak_mb": peak_mb}
+
+
+def read_csv_strings(csv_path: Path) -> pd.DataFrame:
+    """Parse a whole CSV the way the loader does (read_csv_chunks, dtype=str) into one DataFrame."""
+    return pd.concat(read_csv_chunks(csv_path, LOAD_CHUNK_ROWS), ignore_index=True)
+
+
+def read_cached_file(csv_path: Path, cache_dir: Path) -> pd.DataFrame:
+    """Read a whole CSV through its columnar cache (building the cache on the first call)."""
+    return pd.concat(cached_chunks(csv_path, LOAD_CHUNK_ROWS, read_csv_chunks, cache_dir),
+                     ignore_index=True)
+
+
+def benchmark_file(csv_path: Path, batch_sizes=DEFAULT_BATCH_SIZES,
+                   latency_sec: float = DEFAULT_LATENCY_SEC, trace_memory: bool = True,
+                   upload_workers: int = LOAD_UPLOAD_WORKERS,
+                   queue_depth: int = LOAD_QUEUE_DEPTH) -> list[dict]:
+    """Benchmark every loader stage on one CSV file.
+
+    The parse -> tuples stages don't depend on batch size, so they run once;
+    upload and pipelined run once per batch size.
+
+    Returns:
+        A list of dicts, one per (stage, batch size).
+    """
+    results = []
+
+    def record(stage, stats, batch_size=None):
+        rows_per_sec = row_count / stats["wall_sec"] if stats["wall_sec"] else float("inf")
+        results.append({
+            "file": csv_path.name, "rows": row_count, "batch_size": batch_size, "stage": stage,
+            "wall_sec": round(stats["wall_sec"], 4), "cpu_sec": round(stats["cpu_sec"], 4),
+            "rows_per_sec": round(rows_per_sec),
+            "peak_mb": round(stats["peak_mb"], 1) if stats["peak_mb"] is not None else None,
+        })
+
+    df, stats = measure_stage(read_csv_strings, csv_path, trace_memory=trace_memory)
+    row_count = len(df)
+    record("parse", stats)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        read_cached_file(csv_path, Path(cache_dir))  # first read builds the cache
+        _, stats = measure_stage(read_cached_file, csv_path, Path(cache_dir), trace_memory=trace_memory)
+        record("cache_read", stats)
+
+    df, stats = measure_stage(replace_nan, df, trace_memory=trace_memory)
+    record("nan_replace", stats)
+
+    df, stats = measure_stage(stringify_values, df, trace_memory=trace_memory)
+    record("stringify", stats)
+
+    rows, stats = measure_stage(build_rows, df, trace_memory=trace_memory)
+    record("tuples", stats)
+
+    for batch_size in batch_sizes:
+        client = RecordingClient(latency_sec=latency_sec)
+        # Memory isn't traced here — a second pass would double the simulated sleep
+        _, stats = measure_stage(
+            insert_rows, client, "BENCH", list(df.columns), rows, batch_size, trace_memory=False,
+        )
+        record("upload", stats, batch_size)
+
+    for batch_size in batch_sizes:
+        client = RecordingClient(latency_sec=latency_sec)
+        load = partial(load_csv_to_snowflake, queue_depth=queue_depth,
+                       upload_workers=upload_workers, use_cache=False)
+        _, stats = measure_stage(load, client, csv_path, "BENCH", batch_size, trace_memory=False)
+        record("pipelined", stats, batch_size)
+
+    return results
+
+
+def run_loader_benchmarks(scales=DEFAULT_SCALES, batch_sizes=DEFAULT_BATCH_SIZES,
+                          latency_sec: float = DEFAULT_LATENCY_SEC, seed: int = 42,
+                          work_dir: Path = None, trace_memory: bool = True,
+                          upload_workers: int = LOAD_UPLOAD_WORKERS,
+                          queue_depth: int = LOAD_QUEUE_DEPTH) -> list[dict]:
+    """Generate trans.csv at each scale and benchmark the loader on it.
+
+    Args:
+        scales: Generator scale factors — 0.01 is ~10k rows, 1 is ~1M rows.
+        batch_sizes: executemany() batch sizes to compare in the upload stage.
+        latency_sec: Simulated time per round trip.
+        seed: Generator seed, so runs are comparable.
+        work_dir: Where to write generated files (a temp dir by default).
+        trace_memory: Measure peak memory (adds one extra run per stage).
+        upload_workers: Uploads in flight for the pipelined stage.
+        queue_depth: Batches buffered between parser and uploaders (pipelined stage).
+
+    Returns:
+        A list of result dicts (see benchmark_file).
+    """
+    logger.info("=== Running Loader Benchmarks (latency=%.3fs per round trip) ===", latency_sec)
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = Path(work_dir or tmp)
+        for scale in scales:
+            out_dir = base_dir / f"scale_{scale}"
+            generate_dataset(out_dir, scale=scale, seed=seed)
+            results.extend(benchmark_file(out_dir / "trans.csv", batch_sizes, latency_sec,
+                                          trace_memory, upload_workers, queue_depth))
+
+    for r in results:
+        batch = r["batch_size"] if r["batch_size"] is not None else "-"
+        peak = f"{r['peak_mb']:.1f} MB" if r["peak_mb"] is not None else "-"
+        logger.info("%9d rows  %-12s batch=%-6s %8.3fs wall %8.3fs cpu %10d rows/s  peak %s",
+                    r["rows"], r["stage"], batch, r["wall_sec"], r["cpu_sec"], r["rows_per_sec"], peak)
+
+    logger.info("=== Loader benchmarks complete ===")
+    return results
+
+
+if __name__ == "__main__":
+    from src.logging_config import setup_logging
+    setup_logging()
+
+    parser = argparse.ArgumentParser(description="Benchmark the RAW loader offline.")
+    parser.add_argument("--scales", type=float, nargs="+", default=list(DEFAULT_SCALES))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=list(DEFAULT_BATCH_SIZES))
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY_SEC,
+                        help="Simulated seconds per round trip")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--upload-workers", type=int, default=LOAD_UPLOAD_WORKERS)
+    parser.add_argument("--queue-depth", type=int, default=LOAD_QUEUE_DEPTH)
+    parser.add_argument("--no-memory", action="store_true", help="Skip peak-memory tracing")
+    parser.add_argument("--out", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    bench = run_loader_benchmarks(args.scales, args.batch_sizes, args.latency, args.seed,
+                                  trace_memory=not args.no_memory,
+                                  upload_workers=args.upload_workers, queue_depth=args.queue_depth)
+    if args.out:
+        args.out.write_text(json.dumps(bench, indent=2))
+        logger.info("Results written to %s", args.out)
@@ -0,0 +1,195 @@
+"""
+ordering_report.py — Compares load-time ordering with a clustering key on FCT_TRANSACTIONS.
+
+HIGH-LEVEL EXPLANATION:
+    There are two ways to get FCT_TRANSACTIONS clustered by date:
+
+      clustering key   ALTER TABLE ... CLUSTER BY (...) and let Snowflake's
+                       background service recluster it — costs credits after
+                       every rebuild
+      natural order    load RAW.TRANS sorted and build the fact table with
+                       ORDER BY TRANSACTION_DATE, ACCOUNT_KEY — costs one sort
+                       at build time and nothing after
+
+    This script measures both, plus an unordered copy for reference:
+
+      1. natural:    the table as the pipeline built it (no clustering key)
+      2. unordered:  a clone rewritten in random order (what you get when
+                     nobody controls the load order)
+      3. clustering key: a clone of the unordered copy with CLUSTER BY set,
+                     after automatic reclustering settles
+
+    For each one it records SYSTEM$CLUSTERING_INFORMATION (depth, overlaps)
+    and median demo query times, by swapping the clone into place exactly like
+    clustering_experiment.py does. For the clustering key it also reports the
+    reclustering credits Snowflake billed. The result is a markdown report.
+
+    Usage:
+        python -m src.perf.ordering_report
+        python -m src.perf.ordering_report --key "TRANSACTION_DATE" --runs 5
+
+WHY THIS MATTERS AT RBC:
+    A clustering key is a standing cost. If writing the data in the right
+    order gets the same pruning for free, that's the better default.
+"""
+
+import argparse
+import logging
+import time
+from pathlib import Path
+
+from src.config import PROJECT_ROOT, get_snowflake_config
+from src.load.snowflake_client import SnowflakeClient
+from src.perf.clustering_experiment import (
+    DEFAULT_TABLE, WAIT_TIMEOUT_SEC, benchmark_queries, get_clustering_info,
+    get_current_clustering_key, wait_for_reclustering,
+)
+
+logger = logging.getLogger("finflow.ordering_report")
+
+DEFAULT_KEY = "YEAR(TRANSACTION_DATE), MONTH(TRANSACTION_DATE)"
+DEFAULT_REPORT_PATH = PROJECT_ROOT / "reports" / "physical_ordering.md"
+
+
+def reclustering_credits(client: SnowflakeClient, table: str, since_sec: float) -> float:
+    """Credits automatic clustering billed for `table` over the last since_sec seconds.
+
+    AUTOMATIC_CLUSTERING_HISTORY can lag by up to a few hours, so a fresh
+    number is a lower bound.
+    """
+    database = table.split(".")[0]
+    rows = client.execute(
+        f"SELECT COALESCE(SUM(CREDITS_USED), 0) FROM TABLE({database}.INFORMATION_SCHEMA."
+        f"AUTOMATIC_CLUSTERING_HISTORY("
+        f"DATE_RANGE_START => DATEADD('second', -{int(since_sec) + 60}, CURRENT_TIMESTAMP()), "
+        f"TABLE_NAME => '{table}'))"
+    )
+    return float(rows[0][0]) if rows and rows[0][0] is not None else 0.0
+
+
+def measure_in_place(client: SnowflakeClient, table: str, clone: str, key: str, runs: int) -> dict:
+    """Clustering info for `clone`, plus demo query times with it swapped in for `table`."""
+    info = get_clustering_info(client, clone, key)
+    client.execute(f"ALTER TABLE {table} SWAP WITH {clone}")
+    try:
+        query_ms = benchmark_queries(client, runs)
+    finally:
+        client.execute(f"ALTER TABLE {table} SWAP WITH {clone}")
+    return {**info, "query_ms": query_ms, "total_ms": sum(query_ms.values())}
+
+
+def write_report(path: Path, table: str, key: str, rows: list[dict]):
+    """Write the comparison as a markdown report."""
+    queries = list(rows[0]["query_ms"])
+    lines = [
+        f"# Physical Ordering vs Clustering Key — {table}",
+        "",
+        f"Run at {time.strftime('%Y-%m-%d %H:%M')}. Depth and overlaps are measured on "
+        f"`({key})`. Query times are medians in ms.",
+        "",
+        "| Layout | Avg depth | Avg overlaps | Partitions | Prep sec | Recluster credits | "
+        + " | ".join(queries) + " | Total |",
+        "|--------|-----------|--------------|------------|----------|-------------------|"
+        + "|".join("---" for _ in queries) + "|-------|",
+    ]
+    for r in rows:
+        credits = "-" if r["credits"] is None else f"{r['credits']:.3f}"
+        lines.append(
+            f"| {r['layout']} | {r['average_depth']} | {r['average_overlaps']} | "
+            f"{r['total_partition_count']} | {r['prepare_sec']} | {credits} | "
+            + " | ".join(str(r["query_ms"].get(q, "")) for q in queries)
+            + f" | {r['total_ms']} |"
+        )
+    lines += [
+        "",
+        "Recluster credits come from AUTOMATIC_CLUSTERING_HISTORY, which can lag by a",
+        "few hours — re-check the clustering key's number later for the full cost.",
+    ]
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines) + "\n")
+    logger.info("Report written to %s", path)
+
+
+def run_ordering_report(client: SnowflakeClient, table: str = DEFAULT_TABLE, key: str = DEFAULT_KEY,
+                        runs: int = 3, timeout_sec: float = WAIT_TIMEOUT_SEC,
+                        report_path: Path = DEFAULT_REPORT_PATH) -> list[dict]:
+    """Measure natural ordering, an unordered copy, and a clustering key on `table`.
+
+    Args:
+        client: An active SnowflakeClient connection.
+        table: Fully qualified table name (DATABASE.SCHEMA.TABLE).
+        key: Clustering key to compare against (and to measure depth on).
+        runs: Times to run the demo queries per layout (median is reported).
+        timeout_sec: Longest to wait for automatic reclustering.
+        report_path: Where to write the markdown report.
+
+    Returns:
+        One dict per layout: {"layout", "prepare_sec", "credits", depth stats..., "query_ms", "total_ms"}
+    """
+    unordered = f"{table}__UNORDERED"
+    clustered = f"{table}__CK"
+    rows = []
+
+    logger.info("=== Physical Ordering Report on %s ===", table)
+    client.execute("ALTER SESSION SET USE_CACHED_RESULT = FALSE")
+    try:
+        current_key = get_current_clustering_key(client, table)
+        if current_key:
+            logger.warning("%s has CLUSTER BY (%s) — 'natural' below is not load order alone",
+                           table, current_key)
+
+        # 1. Natural: the table as built, measured in place
+        query_ms = benchmark_queries(client, runs)
+        rows.append({"layout": "natural (ORDER BY at load)", "prepare_sec": 0.0, "credits": 0.0,
+                     **get_clustering_info(client, table, key),
+                     "query_ms": query_ms, "total_ms": sum(query_ms.values())})
+
+        try:
+            # 2. Unordered: same rows, random physical order
+            client.execute(f"CREATE OR REPLACE TABLE {unordered} CLONE {table}")
+            start = time.time()
+            client.execute(f"INSERT OVERWRITE INTO {unordered} SELECT * FROM {unordered} ORDER BY RANDOM()")
+            rows.append({"layout": "unordered", "prepare_sec": round(time.time() - start, 1),
+                         "credits": None, **measure_in_place(client, table, unordered, key, runs)})
+
+            # 3. Clustering key: start from the unordered copy and let Snowflake recluster it
+            client.execute(f"CREATE OR REPLACE TABLE {clustered} CLONE {unordered}")
+            client.execute(f"ALTER TABLE {clustered} CLUSTER BY ({key})")
+            start = time.time()
+            # Clones start with automatic clustering suspended
+            client.execute(f"ALTER TABLE {clustered} RESUME RECLUSTER")
+            wait_for_reclustering(client, clustered, key, timeout_sec=timeout_sec)
+            prepare_sec = time.time() - start
+            rows.append({"layout": f"CLUSTER BY ({key})", "prepare_sec": round(prepare_sec, 1),
+                         "credits": reclustering_credits(client, clustered, prepare_sec),
+                         **measure_in_place(client, table, clustered, key, runs)})
+        finally:
+            client.execute(f"DROP TABLE IF EXISTS {clustered}")
+            client.execute(f"DROP TABLE IF EXISTS {unordered}")
+    finally:
+        client.execute("ALTER SESSION UNSET USE_CACHED_RESULT")
+
+    for r in rows:
+        logger.info("%-50s depth=%-8s total=%d ms", r["layout"], r["average_depth"], r["total_ms"])
+
+    write_report(report_path, table, key, rows)
+    logger.info("=== Physical ordering report complete ===")
+    return rows
+
+
+if __name__ == "__main__":
+    from src.logging_config import setup_logging
+    setup_logging()
+
+    parser = argparse.ArgumentParser(description="Compare load-time ordering with a clustering key.")
+    parser.add_argument("--table", default=DEFAULT_TABLE)
+    parser.add_argument("--key", default=DEFAULT_KEY, help="Clustering key to compare against")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=WAIT_TIMEOUT_SEC,
+                        help="Seconds to wait for automatic reclustering")
+    parser.add_argument("--report", type=Path, default=DEFAULT_REPORT_PATH)
+    args = parser.parse_args()
+
+    with SnowflakeClient(get_snowflake_config()) as sf_client:
+        run_ordering_report(sf_client, args.table, args.key, args.runs, args.timeout, args.report)
@@ -0,0 +1,109 @@
+"""
+recording_client.py — A stand-in for SnowflakeClient that records SQL instead of running it.
+
+HIGH-LEVEL EXPLANATION:
+    Benchmarks and tests often need "something that looks like a Snowflake
+    connection" without a live account. RecordingClient has the same methods
+    as SnowflakeClient (execute, execute_file, conn.cursor(), with-statement)
+    but it only:
+      1. Records every statement it receives (so tests can assert on them)
+      2. Sleeps for a simulated network round trip on every call
+      3. Returns canned results (empty by default)
+
+    Example:
+        client = RecordingClient(latency_sec=0.05)
+        load_csv_to_snowflake(client, Path("data/trans.csv"), "TRANS")
+        print(client.round_trips, client.rows_received)
+
+WHY THIS MATTERS AT RBC:
+    Client-side code (parsing, batching, orchestration) should be measurable
+    and testable without burning warehouse credits. A recording fake makes
+    results reproducible on any laptop.
+"""
+
+import threading
+import time
+from pathlib import Path
+
+
+class RecordingCursor:
+    """Cursor that records statements on its parent client."""
+
+    def __init__(self, client: "RecordingClient"):
+        self.client = client
+        self._results = []
+
+    def execute(self, sql: str, params: tuple = None):
+        self._results = self.client._record(sql, params)
+        return self
+
+    def executemany(self, sql: str, seq_of_params):
+        # Only the row count is kept — holding every batch would skew memory benchmarks
+        self.client._record(sql, None, rows=len(seq_of_params))
+        return self
+
+    def fetchall(self) -> list:
+        return list(self._results)
+
+    def fetchone(self):
+        return self._results[0] if self._results else None
+
+    def close(self):
+        pass
+
+
+class RecordingClient:
+    """Drop-in replacement for SnowflakeClient that records instead of executing."""
+
+    def __init__(self, latency_sec: float = 0.0, responses: dict = None):
+        """
+        Args:
+            latency_sec: Simulated network time added to every round trip.
+            responses: Optional {sql substring: rows} map — the first substring
+                       found in a statement decides what fetchall() returns.
+        """
+        self.latency_sec = latency_sec
+        self.responses = responses or {}
+        self.statements = []
+        self.round_trips = 0
+        self.rows_received = 0
+        self.conn = self
+        # Loader upload threads share one client, as they share one real connection
+        self._lock = threading.Lock()
+
+    def cursor(self) -> RecordingCursor:
+        return RecordingCursor(self)
+
+    def _record(self, sql: str, params: tuple = None, rows: int = 0) -> list:
+        """Log one round trip and return its canned result."""
+        with self._lock:
+            self.statements.append(sql)
+            self.round_trips += 1
+            self.rows_received += rows
+        if self.latency_sec:
+            time.sleep(self.latency_sec)
+        for fragment, result in self.responses.items():
+            if fragment in sql:
+                return result
+        return []
+
+    def connect(self):
+        pass
+
+    def close(self):
+        pass
+
+    def execute(self, sql: str, params: tuple = None) -> list:
+        return self._record(sql, params)
+
+    def execute_file(self, filepath: Path):
+        statements = [s.strip() for s in Path(filepath).read_text().split(";") if s.strip()]
+        for stmt in statements:
+            self.execute(stmt)
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -18,11 +18,36 @@ WHY THIS MATTERS AT RBC:
 
 import logging
 import time
+from pathlib import Path
+
 from src.config import SQL_DIR
 from src.load.snowflake_client import SnowflakeClient
 
 logger = logging.getLogger("finflow.benchmarks")
 
+DEMO_QUERIES_FILE = SQL_DIR / "05_demo_queries.sql"
+
+
+def load_demo_queries(path: Path = DEMO_QUERIES_FILE) -> list[tuple[str, str]]:
+    """Split the demo query file into (name, SQL) pairs.
+
+    A statement's name is the last comment line above its SQL (so the file's
+    header comment doesn't name Query 1), or "Query N" if it has none.
+    """
+    statements = [s.strip() for s in path.read_text().split(";") if s.strip()]
+    queries = []
+    for i, stmt in enumerate(statements, 1):
+        comments = []
+        for line in stmt.split("\n"):
+            line = line.strip()
+            if line and not line.startswith("--"):
+                break
+            if line:
+                comments.append(line.lstrip("- ").strip())
+        query_name = comments[-1] if comments else f"Query {i}"
+        queries.append((query_name, stmt))
+    return queries
+
 
 def run_benchmarks(client: SnowflakeClient) -> list[dict]:
     """Time each demo query and return results.
@@ -31,17 +56,9 @@ def run_benchmarks(client: SnowflakeClient) -> list[dict]:
         A list of dicts like: [{"query": "...", "duration_sec": 1.23}, ...]
     """
     logger.info("=== Running Performance Benchmarks ===")
-
-    demo_file = SQL_DIR / "05_demo_queries.sql"
-    sql_text = demo_file.read_text()
-
-    statements = [s.strip() for s in sql_text.split(";") if s.strip()]
     results = []
 
-    for i, stmt in enumerate(statements, 1):
-        first_line = stmt.split("\n")[0].strip()
-        query_name = first_line.lstrip("- ").strip() if first_line.startswith("--") else f"Query {i}"
-
+    for query_name, stmt in load_demo_queries():
         start = time.time()
         client.execute(stmt)
         elapsed = time.time() - start
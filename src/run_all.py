@@ -27,8 +27,11 @@ import time
 import logging
 
 from src.logging_config import setup_logging
-from src.config import get_snowflake_config, SQL_DIR
+from src.config import (
+    get_snowflake_config, get_warehouse_profiles, SQL_DIR, SUSPEND_WAREHOUSE_AT_END,
+)
 from src.load.snowflake_client import SnowflakeClient
+from src.load.warehouse_manager import WarehouseManager
 from src.load.load_raw import load_all_csvs
 from src.transform.build_analytics import build_analytics_tables
 from src.validate.run_quality_checks import run_quality_checks
@@ -45,6 +48,7 @@ def main():
     logger.info("=" * 60)
 
     sf_config = get_snowflake_config()
+    warehouse_profiles = get_warehouse_profiles()
 
     with SnowflakeClient(sf_config) as client:
         # Step 1: Set up Snowflake objects (database, schemas, warehouse)
@@ -55,27 +59,39 @@ def main():
         logger.info("--- Step 2: Create RAW tables ---")
         client.execute_file(SQL_DIR / "01_create_raw_tables.sql")
 
-        # Step 3: Load CSV data into RAW
-        logger.info("--- Step 3: Load data into RAW ---")
-        load_all_csvs(client)
-
-        # Step 4 & 5: Build ANALYTICS (create tables + transform)
-        logger.info("--- Step 4: Build ANALYTICS layer ---")
-        build_analytics_tables(client)
-
-        # Step 6: Quality checks
-        logger.info("--- Step 5: Data quality checks ---")
-        checks_passed = run_quality_checks(client)
-        if not checks_passed:
-            logger.error("Quality checks FAILED. Pipeline stopping.")
-            sys.exit(1)
-
-        # Step 7 & 8: Demo queries + benchmarks
-        logger.info("--- Step 6: Performance benchmarks ---")
-        benchmark_results = run_benchmarks(client)
-
-        for result in benchmark_results:
-            logger.info("  %s: %.3f sec", result["query"], result["duration_sec"])
+        # Each stage below runs on its own compute profile (see config.get_warehouse_profiles)
+        warehouses = WarehouseManager(client, sf_config["warehouse"], warehouse_profiles)
+
+        try:
+            # Step 3: Load CSV data into RAW
+            logger.info("--- Step 3: Load data into RAW ---")
+            with warehouses.stage("load"):
+                load_all_csvs(client)
+
+            # Step 4 & 5: Build ANALYTICS (create tables + transform)
+            logger.info("--- Step 4: Build ANALYTICS layer ---")
+            with warehouses.stage("transform"):
+                build_analytics_tables(client)
+
+            # Step 6: Quality checks
+            logger.info("--- Step 5: Data quality checks ---")
+            with warehouses.stage("quality"):
+                checks_passed = run_quality_checks(client)
+            if not checks_passed:
+                logger.error("Quality checks FAILED. Pipeline stopping.")
+                sys.exit(1)
+
+            # Step 7 & 8: Demo queries + benchmarks
+            logger.info("--- Step 6: Performance benchmarks ---")
+            with warehouses.stage("benchmarks"):
+                benchmark_results = run_benchmarks(client)
+
+            for result in benchmark_results:
+                logger.info("  %s: %.3f sec", result["query"], result["duration_sec"])
+        finally:
+            # Don't leave compute running (and billing) until AUTO_SUSPEND kicks in
+            if SUSPEND_WAREHOUSE_AT_END:
+                warehouses.suspend_all()
 
     elapsed = time.time() - pipeline_start
     logger.info("=" * 60)
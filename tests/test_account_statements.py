@@ -0,0 +1,156 @@
+"""
+test_account_statements.py — Tests for the account statement API.
+
+HIGH-LEVEL EXPLANATION:
+    A tiny fake client answers the keyset queries from an in-memory list,
+    applying the same WHERE / ORDER BY / LIMIT the SQL would. That lets us
+    check pagination, caching and connection reuse without Snowflake.
+"""
+
+from datetime import date
+
+from src.api.account_statements import AccountStatementAPI, ConnectionPool
+from src.perf.api_benchmarks import percentile, run_api_benchmark
+
+# (TRANSACTION_KEY, ACCOUNT_KEY, TRANSACTION_DATE) — two rows share a date to exercise the tiebreak
+TRANSACTIONS = [
+    (1, 7, date(1995, 1, 1)), (2, 7, date(1995, 1, 2)), (5, 7, date(1995, 1, 2)),
+    (3, 7, date(1995, 1, 3)), (4, 8, date(1995, 1, 1)), (6, 7, date(1996, 6, 1)),
+]
+
+
+class FakeCursor:
+    def __init__(self, client):
+        self.client = client
+        self.results = []
+
+    def execute(self, sql, params):
+        self.client.queries += 1
+        self.client.sql.append(sql)
+        account, start, end = params[:3]
+        rows = sorted((t for t in TRANSACTIONS if t[1] == account and start <= t[2] <= end),
+                      key=lambda t: (t[2], t[0]))
+        if len(params) == 7:
+            last_date, _, last_key = params[3:6]
+            rows = [t for t in rows if (t[2], t[0]) > (last_date, last_key)]
+        self.results = [(t[0], t[2], "PRIJEM", "VKLAD", 100, 200, None) for t in rows[:params[-1]]]
+
+    def fetchall(self):
+        return self.results
+
+    def close(self):
+        pass
+
+
+class FakeClient:
+    opened = 0
+
+    instances = []
+
+    def __init__(self, config):
+        self.config = config
+        self.queries = 0
+        self.sql = []
+        self.conn = self
+        FakeClient.instances.append(self)
+
+    def connect(self):
+        FakeClient.opened += 1
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self):
+        pass
+
+
+def make_api(**kwargs):
+    FakeClient.opened = 0
+    FakeClient.instances = []
+    pool = ConnectionPool({}, size=2, client_factory=FakeClient)
+    return AccountStatementAPI(pool, **kwargs)
+
+
+def test_keyset_pagination_walks_every_row_in_order():
+    """Pages follow (date, key) order, including rows that share a date."""
+    api = make_api(page_size=2)
+    start, end = date(1995, 1, 1), date(1995, 12, 31)
+
+    first = api.get_page(7, start, end)
+    assert [r["TRANSACTION_KEY"] for r in first["rows"]] == [1, 2]
+    assert first["next_cursor"] == (date(1995, 1, 2), 2)
+
+    second = api.get_page(7, start, end, after=first["next_cursor"])
+    assert [r["TRANSACTION_KEY"] for r in second["rows"]] == [5, 3]
+    assert second["next_cursor"] is None
+
+    assert [r["TRANSACTION_KEY"] for r in api.iter_transactions(7, start, end)] == [1, 2, 5, 3]
+
+
+def test_cache_hits_skip_the_warehouse_and_evict_lru_account():
+    """Repeated pages come from the cache; the oldest account is evicted first."""
+    api = make_api(page_size=10, cached_accounts=1)
+    start, end = date(1993, 1, 1), date(1998, 12, 31)
+
+    api.get_page(7, start, end)
+    api.get_page(7, start, end)
+    assert (api.hits, api.misses) == (1, 1)
+
+    api.get_page(8, start, end)   # evicts account 7
+    api.get_page(7, start, end)
+    assert api.misses == 3
+
+    api.invalidate(7)
+    api.get_page(7, start, end)
+    assert api.misses == 4
+
+
+def test_pages_per_account_are_capped_and_returned_as_copies():
+    """One busy account can't grow the cache without bound, and mutating a result doesn't corrupt it."""
+    api = make_api(page_size=10, cached_pages=2)
+    start = date(1993, 1, 1)
+
+    for month in range(1, 6):   # five distinct date ranges -> five pages for one account
+        api.get_page(7, start, date(1995, month, 28))
+    assert len(api._cache[7]) == 2
+
+    page = api.get_page(7, start, date(1995, 5, 28))
+    page["rows"][0]["AMOUNT"] = -1
+    page["rows"].clear()
+    again = api.get_page(7, start, date(1995, 5, 28))
+    assert api.hits == 2
+    assert len(again["rows"]) == 4 and again["rows"][0]["AMOUNT"] == 100
+
+
+def test_lookups_bind_parameters_server_side():
+    """Pool connections use qmark, so values travel as binds and the SQL text is the same every call."""
+    api = make_api(page_size=1, cached_accounts=0)
+    start, end = date(1995, 1, 1), date(1995, 12, 31)
+    first = api.get_page(7, start, end)
+    api.get_page(7, start, end, after=first["next_cursor"])
+    api.get_page(8, start, end)
+
+    client = FakeClient.instances[0]
+    assert client.config["paramstyle"] == "qmark"
+    assert "%s" not in client.sql[0] and "ACCOUNT_KEY = ?" in client.sql[0]
+    assert client.sql[0] == client.sql[2] != client.sql[1]
+
+
+def test_pool_reuses_connections():
+    """Sequential lookups reuse one pooled connection instead of reconnecting."""
+    api = make_api(page_size=10, cached_accounts=0)
+    for _ in range(5):
+        api.get_page(7, date(1993, 1, 1), date(1998, 12, 31))
+    assert FakeClient.opened == 1
+
+
+def test_api_benchmark_reports_percentiles():
+    """The benchmark reports p50/p99 for cold, next-page and warm lookups."""
+    api = make_api(page_size=2)
+    summary = run_api_benchmark(api, [7, 8])
+
+    assert summary["cold"]["n"] == 2
+    assert summary["next_page"]["n"] == 1
+    assert summary["warm"]["n"] == 2
+    assert percentile([5, 1, 3, 2, 4], 50) == 3
+    assert percentile([5, 1, 3, 2, 4], 99) == 5
@@ -0,0 +1,71 @@
+"""
+test_approx_queries.py — Tests for the sampled / approximate demo query mode.
+
+HIGH-LEVEL EXPLANATION:
+    The rewrites are plain text substitutions, so we check them on the real
+    demo queries: the fact table gets a SAMPLE clause, additive aggregates are
+    scaled back up, and distinct counts become APPROX_COUNT_DISTINCT. The
+    accuracy comparison is checked on hand-made result rows.
+"""
+
+import pytest
+
+from src.perf.approx_queries import (
+    compare_results, compare_with_exact, group_key_count, margin_pct, rewrite_query,
+)
+from src.perf.recording_client import RecordingClient
+from src.perf.run_benchmarks import load_demo_queries
+
+
+def demo_query(number: int) -> str:
+    return load_demo_queries()[number - 1][1]
+
+
+def test_sample_rewrite_scales_additive_aggregates():
+    sql = rewrite_query(demo_query(6), rate=10, seed=7)
+
+    assert "FCT_TRANSACTIONS f SAMPLE BERNOULLI (10) SEED (7) ON" in sql
+    assert "ROUND(COUNT(f.TRANSACTION_KEY) / 0.1)" in sql
+    assert "(SUM(f.AMOUNT) / 0.1)" in sql
+    assert "APPROX_COUNT_DISTINCT(c.CUSTOMER_KEY)" in sql
+    assert "AVG(f.AMOUNT)" in sql and "AVG(f.AMOUNT) /" not in sql
+    assert "SELECT\n    COUNT(*) AS SAMPLED_ROWS," in sql
+
+    with pytest.raises(ValueError):
+        rewrite_query(demo_query(1), rate=0)
+
+
+def test_approx_mode_only_swaps_distinct_counts():
+    exact = demo_query(6)
+    sql = rewrite_query(exact, rate=None)
+    assert "SAMPLE" not in sql and "SAMPLED_ROWS" not in sql
+    assert sql == exact.replace("COUNT(DISTINCT c.CUSTOMER_KEY)", "APPROX_COUNT_DISTINCT(c.CUSTOMER_KEY)")
+
+
+def test_group_keys_and_margins():
+    assert [group_key_count(sql) for _, sql in load_demo_queries()] == [3, 3, 1, 2, 1, 1]
+    # 10,000 sampled rows at 10%: 1.96 * sqrt(0.9 / 10000) = 1.86%
+    assert margin_pct(10_000, 10) == pytest.approx(1.859, abs=0.001)
+    assert margin_pct(500, 100) == 0.0
+
+
+def test_compare_results_matches_groups_and_measures_error():
+    exact = [("Prague", 1000, 50000.0), ("south Moravia", 800, 40000.0), ("east Bohemia", 10, 100.0)]
+    approx = [("Prague", 1010, 49000.0), ("south Moravia", 800, 40000.0), ("north Bohemia", 5, 10.0)]
+
+    result = compare_results(exact, approx, key_count=1, margins_pct=[1.5, 1.5, 50.0])
+
+    assert result["groups"] == 3 and result["matched"] == 2
+    assert result["max_error_pct"] == 2.0
+    assert result["within_margin_pct"] == 75  # Prague's SUM is 2% off, outside its 1.5% margin
+
+
+def test_compare_with_exact_writes_report(tmp_path):
+    client = RecordingClient()
+    report = tmp_path / "approx.md"
+
+    comparisons = compare_with_exact(client, rates=[5], runs=1, report_path=report)
+
+    assert [c["mode"] for c in comparisons] == ["approx"] * 6 + ["sample 5%"] * 6
+    assert client.statements[-1] == "ALTER SESSION UNSET USE_CACHED_RESULT"
+    assert "| sample 5% | Query 3: Transaction volume by region |" in report.read_text()
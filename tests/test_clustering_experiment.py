@@ -0,0 +1,66 @@
+"""
+test_clustering_experiment.py — Tests for the clustering-key experiment runner.
+
+HIGH-LEVEL EXPLANATION:
+    The experiment issues a precise sequence of CLONE / ALTER / SWAP / DROP
+    statements. We run it against a RecordingClient that returns canned
+    clustering info, and check that the original table is always swapped
+    back, the clone is dropped, and the winner lands in the DDL.
+"""
+
+import json
+
+from src.perf import clustering_experiment
+from src.perf.clustering_experiment import record_clustering_key, run_clustering_experiment
+from src.perf.recording_client import RecordingClient
+
+SAMPLE_DDL = """CREATE OR REPLACE TABLE DIM_DATE (
+    DATE_KEY        DATE        NOT NULL PRIMARY KEY
+);
+
+CREATE OR REPLACE TABLE FCT_TRANSACTIONS (
+    TRANSACTION_KEY INT         NOT NULL PRIMARY KEY,
+    AMOUNT          DECIMAL(12,2)
+)"""
+
+
+def test_record_clustering_key_adds_then_replaces(tmp_path):
+    """Recording twice leaves exactly one CLUSTER BY clause, with the latest key."""
+    ddl = tmp_path / "02_create_analytics_tables.sql"
+    ddl.write_text(SAMPLE_DDL)
+
+    record_clustering_key(ddl, "FCT_TRANSACTIONS", "TRANSACTION_DATE")
+    record_clustering_key(ddl, "FCT_TRANSACTIONS", "YEAR(TRANSACTION_DATE), MONTH(TRANSACTION_DATE)")
+
+    text = ddl.read_text()
+    assert text.count("CLUSTER BY") == 1
+    assert text.endswith("CLUSTER BY (YEAR(TRANSACTION_DATE), MONTH(TRANSACTION_DATE))")
+    assert "DIM_DATE (\n    DATE_KEY        DATE        NOT NULL PRIMARY KEY\n);" in text
+
+
+def test_experiment_restores_table_and_cleans_up(tmp_path, monkeypatch):
+    """Every SWAP is undone, the clone is dropped, and the report/chart are written."""
+    ddl = tmp_path / "ddl.sql"
+    ddl.write_text(SAMPLE_DDL)
+    monkeypatch.setattr(clustering_experiment, "DDL_FILE", ddl)
+
+    info = json.dumps({"average_depth": 1.5, "average_overlaps": 0.8, "total_partition_count": 40})
+    client = RecordingClient(responses={
+        "SYSTEM$CLUSTERING_INFORMATION": [(info,)],
+        "INFORMATION_SCHEMA.TABLES": [(None,)],
+    })
+    report = tmp_path / "report.md"
+
+    result = run_clustering_experiment(
+        client, candidates=["TRANSACTION_DATE"], runs=1,
+        report_path=report, chart_path=tmp_path / "chart.png", record_winner=False,
+    )
+
+    table = "FINFLOW.ANALYTICS.FCT_TRANSACTIONS"
+    swaps = [s for s in client.statements if "SWAP WITH" in s]
+    assert swaps == [f"ALTER TABLE {table} SWAP WITH {table}__CK"] * 2
+    assert f"DROP TABLE IF EXISTS {table}__CK" in client.statements
+    assert client.statements[-1] == "ALTER SESSION UNSET USE_CACHED_RESULT"
+    assert result["results"][0]["average_depth"] == 1.5
+    assert report.exists() and (tmp_path / "chart.png").exists()
+    assert ddl.read_text() == SAMPLE_DDL
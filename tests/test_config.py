@@ -39,3 +39,24 @@ def test_get_snowflake_config_missing_account():
         from src.config import get_snowflake_config
         with pytest.raises(EnvironmentError, match="Missing required"):
             get_snowflake_config()
+
+
+def test_get_warehouse_profiles_defaults_and_overrides():
+    """Transform scales up by default; env vars override any stage."""
+    env = {"SNOWFLAKE_WAREHOUSE_SIZE_LOAD": "small", "SNOWFLAKE_WAREHOUSE_SCALE_DOWN_TRANSFORM": ""}
+    with patch.dict("os.environ", env, clear=False):
+        from src.config import get_warehouse_profiles
+        profiles = get_warehouse_profiles()
+
+    assert profiles["load"]["size"] == "SMALL"
+    assert profiles["transform"]["size"] == "MEDIUM"
+    assert profiles["transform"]["scale_down"] is None
+    assert profiles["quality"] == {"warehouse": None, "size": None, "scale_down": None}
+
+
+def test_get_warehouse_profiles_rejects_unknown_size():
+    """A typo in a size should fail fast with a clear error."""
+    with patch.dict("os.environ", {"SNOWFLAKE_WAREHOUSE_SIZE_TRANSFORM": "MEDUIM"}, clear=False):
+        from src.config import get_warehouse_profiles
+        with pytest.raises(EnvironmentError, match="Invalid warehouse size"):
+            get_warehouse_profiles()
@@ -0,0 +1,114 @@
+"""
+test_csv_cache.py — Tests for the columnar cache of parsed CSVs.
+
+HIGH-LEVEL EXPLANATION:
+    The cache is only safe if (a) a cached read returns exactly what parsing
+    would, (b) a changed CSV is never served from an old cache, and (c) an
+    interrupted first run doesn't leave a half-written cache behind.
+"""
+
+import os
+
+import pandas as pd
+
+from src.load import csv_cache
+from src.load.csv_cache import cache_path, cached_chunks
+from src.load.load_raw import read_csv_chunks, replace_nan
+
+
+def write_csv(path, rows):
+    lines = ['"trans_id";"k_symbol";"amount"']
+    lines += [f'{i};"{"SIPO" if i % 2 else ""}";{i}.5' for i in range(rows)]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+class CountingParser:
+    """Wraps read_csv_chunks and counts how often the CSV is actually parsed."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, csv_path, chunk_rows):
+        self.calls += 1
+        return read_csv_chunks(csv_path, chunk_rows)
+
+
+def test_second_read_comes_from_cache_unchanged(tmp_path):
+    csv_path = write_csv(tmp_path / "trans.csv", rows=25)
+    parse = CountingParser()
+
+    first = pd.concat(cached_chunks(csv_path, 10, parse, tmp_path / "cache"), ignore_index=True)
+    second_chunks = list(cached_chunks(csv_path, 10, parse, tmp_path / "cache"))
+    second = pd.concat(second_chunks, ignore_index=True)
+
+    assert parse.calls == 1
+    assert [len(c) for c in second_chunks] == [10, 10, 5]
+    pd.testing.assert_frame_equal(replace_nan(first), replace_nan(second))
+    assert second.loc[0, "K_SYMBOL"] is None and second.loc[1, "K_SYMBOL"] == "SIPO"
+
+
+def test_changed_csv_gets_a_new_cache(tmp_path):
+    cache_dir = tmp_path / "cache"
+    csv_path = write_csv(tmp_path / "trans.csv", rows=5)
+    list(cached_chunks(csv_path, 10, read_csv_chunks, cache_dir))
+    old_cache = cache_path(csv_path, cache_dir)
+
+    write_csv(csv_path, rows=8)
+    os.utime(csv_path, ns=(0, old_cache.stat().st_mtime_ns + 1))
+    rows = pd.concat(cached_chunks(csv_path, 10, read_csv_chunks, cache_dir))
+
+    assert len(rows) == 8
+    assert not old_cache.exists()
+    assert [p.name for p in cache_dir.iterdir()] == [cache_path(csv_path, cache_dir).name]
+
+
+def test_same_name_csvs_in_different_folders_keep_their_own_caches(tmp_path):
+    cache_dir = tmp_path / "cache"
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    first = write_csv(tmp_path / "a" / "trans.csv", rows=5)
+    second = write_csv(tmp_path / "b" / "trans.csv", rows=7)
+    os.utime(second, ns=(0, first.stat().st_mtime_ns))
+
+    for csv_path in (first, second, first):
+        list(cached_chunks(csv_path, 10, read_csv_chunks, cache_dir))
+
+    assert cache_path(first, cache_dir) != cache_path(second, cache_dir)
+    assert cache_path(first, cache_dir).exists() and cache_path(second, cache_dir).exists()
+
+
+def test_sorted_and_unsorted_caches_of_one_csv_coexist(tmp_path):
+    cache_dir = tmp_path / "cache"
+    csv_path = write_csv(tmp_path / "trans.csv", rows=5)
+    parse = CountingParser()
+
+    for variant in ("", "sorted by AMOUNT", "", "sorted by AMOUNT"):
+        list(cached_chunks(csv_path, 10, parse, cache_dir, variant=variant))
+
+    assert parse.calls == 2
+    assert cache_path(csv_path, cache_dir).exists()
+    assert cache_path(csv_path, cache_dir, "sorted by AMOUNT").exists()
+
+
+def test_format_version_bump_invalidates_old_caches(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    csv_path = write_csv(tmp_path / "trans.csv", rows=5)
+    list(cached_chunks(csv_path, 10, read_csv_chunks, cache_dir))
+    old_cache = cache_path(csv_path, cache_dir)
+
+    monkeypatch.setattr(csv_cache, "CACHE_FORMAT_VERSION", csv_cache.CACHE_FORMAT_VERSION + 1)
+    parse = CountingParser()
+    list(cached_chunks(csv_path, 10, parse, cache_dir))
+
+    assert parse.calls == 1
+    assert not old_cache.exists() and cache_path(csv_path, cache_dir).exists()
+
+
+def test_interrupted_build_leaves_no_cache(tmp_path):
+    csv_path = write_csv(tmp_path / "trans.csv", rows=30)
+    chunks = cached_chunks(csv_path, 10, read_csv_chunks, tmp_path / "cache")
+    next(chunks)
+    chunks.close()  # e.g. the upload failed after the first chunk
+
+    assert list((tmp_path / "cache").iterdir()) == []
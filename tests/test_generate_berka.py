@@ -0,0 +1,84 @@
+"""
+test_generate_berka.py — Tests for the synthetic Berka dataset generator.
+
+HIGH-LEVEL EXPLANATION:
+    We generate a tiny dataset (scale 0.01 = ~10k transactions) into a
+    temporary folder and check that it looks exactly like the real files:
+    semicolon separated, YYMMDD dates, gender-encoded birth numbers, and
+    foreign keys that always point at rows that exist.
+"""
+
+import pandas as pd
+import pytest
+
+from src.generate.generate_berka import generate_dataset
+
+EXPECTED_FILES = ["account", "card", "client", "disp", "district", "loan", "order", "trans"]
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    """Generate one small dataset and read every file back with ';'."""
+    out_dir = tmp_path_factory.mktemp("berka")
+    generate_dataset(out_dir, scale=0.01, seed=7, chunk_rows=2000, workers=1)
+    return out_dir, {name: pd.read_csv(out_dir / f"{name}.csv", sep=";") for name in EXPECTED_FILES}
+
+
+def test_writes_all_eight_csvs_at_scale(dataset):
+    """All 8 files exist, and row counts follow the scale factor."""
+    _, tables = dataset
+    assert len(tables["trans"]) == 10563
+    assert len(tables["account"]) == 45
+    assert len(tables["district"]) == 77
+    assert list(tables["district"].columns) == [f"A{i}" for i in range(1, 17)]
+
+
+def test_dates_are_valid_yymmdd(dataset):
+    """Every date column parses as YYMMDD within 1993-1998."""
+    _, tables = dataset
+    for name in ("trans", "account", "loan"):
+        dates = pd.to_datetime(tables[name]["date"].astype(str).str.zfill(6), format="%y%m%d")
+        assert dates.min() >= pd.Timestamp("1993-01-01")
+        assert dates.max() <= pd.Timestamp("1998-12-31")
+
+
+def test_birth_numbers_encode_gender(dataset):
+    """Month is 1-12 for men and 51-62 for women."""
+    _, tables = dataset
+    month = tables["client"]["birth_number"] // 100 % 100
+    assert month.between(1, 12).sum() + month.between(51, 62).sum() == len(month)
+    assert month.between(51, 62).any()
+
+
+def test_foreign_keys_are_consistent(dataset):
+    """Every child row points at a parent row that exists."""
+    _, tables = dataset
+    account_ids = set(tables["account"]["account_id"])
+    assert set(tables["trans"]["account_id"]) <= account_ids
+    assert set(tables["loan"]["account_id"]) <= account_ids
+    assert set(tables["order"]["account_id"]) <= account_ids
+    assert set(tables["disp"]["account_id"]) <= account_ids
+    assert set(tables["disp"]["client_id"]) <= set(tables["client"]["client_id"])
+    assert set(tables["card"]["disp_id"]) <= set(tables["disp"]["disp_id"])
+    assert set(tables["account"]["district_id"]) <= set(tables["district"]["A1"])
+    assert tables["trans"]["trans_id"].is_unique
+
+
+def test_balances_stay_positive_and_follow_the_amounts(dataset):
+    """Credits and debits balance out, so running balances never go negative (or below the opening floor)."""
+    _, tables = dataset
+    trans = tables["trans"]
+    assert trans["balance"].min() >= 1_000 - 0.1
+
+    # Within an account, each balance is the previous one plus the signed amount
+    signed = trans["amount"].where(trans["type"] == "PRIJEM", -trans["amount"])
+    step = trans["balance"] - trans.groupby("account_id")["balance"].shift()
+    assert ((step - signed).dropna().abs() < 0.2).all()
+
+
+def test_same_seed_is_reproducible(dataset, tmp_path):
+    """Same seed and scale produce byte-identical files, regardless of chunking workers."""
+    out_dir, _ = dataset
+    generate_dataset(tmp_path, scale=0.01, seed=7, chunk_rows=2000, workers=2)
+    for name in EXPECTED_FILES:
+        assert (tmp_path / f"{name}.csv").read_bytes() == (out_dir / f"{name}.csv").read_bytes()
@@ -0,0 +1,92 @@
+"""
+test_generate_charts.py — Tests for snapshot-based, change-aware chart rendering.
+
+HIGH-LEVEL EXPLANATION:
+    Charts are built from one cached snapshot and only re-rendered when their
+    input changes. We check that the snapshot is fetched once and then read
+    from Parquet, and that a second run with the same data renders nothing.
+"""
+
+import os
+import subprocess
+import sys
+from datetime import date
+
+import pandas as pd
+
+from src.charts.generate_charts import CHARTS, chart_hash, generate_all_charts, load_chart_snapshot
+from src.config import PROJECT_ROOT
+from src.perf.recording_client import RecordingClient
+
+SNAPSHOT_ROWS = [
+    (date(1995, 1, 3), 1995, 1, "PRIJEM", "Prague", 10, 5000.0),
+    (date(1995, 1, 3), 1995, 1, "VYDAJ", "Prague", 7, 2100.0),
+    (date(1995, 2, 14), 1995, 2, "VYDAJ", "south Moravia", 4, 800.0),
+    (date(1995, 2, 15), 1995, 2, "PRIJEM", None, 2, 300.0),
+]
+
+
+def snapshot_queries(client):
+    return sum("GROUP BY" in sql for sql in client.statements)
+
+
+def test_snapshot_is_reused_until_the_source_tables_change(tmp_path):
+    """Only the first call, a change in the tables, or an explicit refresh re-runs the snapshot query."""
+    path = tmp_path / "chart_snapshot.parquet"
+    tables = [("FCT_TRANSACTIONS", 4, "2024-05-01 10:00:00")]
+    client = RecordingClient(responses={"INFORMATION_SCHEMA": tables, "FCT_TRANSACTIONS": SNAPSHOT_ROWS})
+
+    first = load_chart_snapshot(client=client, path=path)
+    second = load_chart_snapshot(client=client, path=path)
+    assert snapshot_queries(client) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+    tables[0] = ("FCT_TRANSACTIONS", 5, "2024-05-02 09:30:00")  # a reload or stream merge
+    load_chart_snapshot(client=client, path=path)
+    load_chart_snapshot(client=client, path=path)
+    assert snapshot_queries(client) == 2
+
+    load_chart_snapshot(refresh=True, client=client, path=path)
+    assert snapshot_queries(client) == 3
+
+
+def test_unchanged_charts_are_skipped(tmp_path):
+    """A second run with the same snapshot renders nothing; changed data re-renders only affected charts."""
+    client = RecordingClient(responses={"FCT_TRANSACTIONS": SNAPSHOT_ROWS})
+    snapshot = load_chart_snapshot(client=client, path=tmp_path / "snap.parquet")
+    charts_dir = tmp_path / "charts"
+
+    first = generate_all_charts(snapshot=snapshot, charts_dir=charts_dir, workers=1)
+    assert sorted(first["rendered"]) == sorted(name for name, _, _ in CHARTS)
+    assert all((charts_dir / name).exists() for name in first["rendered"])
+
+    second = generate_all_charts(snapshot=snapshot, charts_dir=charts_dir, workers=1)
+    assert second["rendered"] == []
+
+    # More volume in an existing region: region chart changes, the static performance chart doesn't
+    changed = snapshot.copy()
+    changed.loc[0, "TOTAL_AMOUNT"] = 99999.0
+    third = generate_all_charts(snapshot=changed, charts_dir=charts_dir, workers=1)
+    assert "06_region_volume.png" in third["rendered"]
+    assert "03_performance.png" in third["skipped"]
+
+    forced = generate_all_charts(snapshot=changed, charts_dir=charts_dir, workers=1, force=True)
+    assert forced["skipped"] == []
+
+
+def test_chart_hash_is_stable_across_processes():
+    """The manifest is compared across runs, so a fresh interpreter must compute the same hashes."""
+    script = (
+        "import pandas as pd\n"
+        "from src.charts.generate_charts import CHARTS, chart_hash\n"
+        "data = pd.DataFrame({'A': [1, 2]})\n"
+        "print(','.join(chart_hash(data, renderer) for _, _, renderer in CHARTS))\n"
+    )
+    runs = [
+        subprocess.run([sys.executable, "-c", script], cwd=PROJECT_ROOT, capture_output=True,
+                       text=True, check=True, env={**os.environ, "PYTHONHASHSEED": seed}).stdout
+        for seed in ("1", "2")
+    ]
+
+    data = pd.DataFrame({"A": [1, 2]})
+    assert runs[0] == runs[1] == ",".join(chart_hash(data, r) for _, _, r in CHARTS) + "\n"
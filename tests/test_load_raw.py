@@ -0,0 +1,134 @@
+"""
+test_load_raw.py — Tests for the pipelined (parse while uploading) RAW loader.
+
+HIGH-LEVEL EXPLANATION:
+    load_csv_to_snowflake now parses chunks on one thread while several
+    upload threads send batches. We check that every row still arrives
+    exactly once, that uploads really overlap, and that a failing upload
+    stops the whole load instead of hanging it.
+"""
+
+import time
+
+import pandas as pd
+import pytest
+
+from src.load.load_raw import load_csv_to_snowflake, pipelined_insert, read_csv_chunks, sort_chunks
+from src.perf.recording_client import RecordingClient
+
+
+def write_csv(path, rows, sep=";"):
+    lines = [sep.join(['"trans_id"', '"account"', '"amount"'])]
+    lines += [sep.join([str(i), str(1000 + i) if i % 4 else "", f"{i}.5"]) for i in range(rows)]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+class CapturingClient(RecordingClient):
+    """RecordingClient that also keeps every inserted row."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.rows = []
+
+    def cursor(self):
+        cursor = super().cursor()
+        executemany = cursor.executemany
+
+        def capture(sql, seq_of_params):
+            with self._lock:
+                self.rows.extend(seq_of_params)
+            return executemany(sql, seq_of_params)
+
+        cursor.executemany = capture
+        return cursor
+
+
+def test_every_row_arrives_once_with_consistent_formatting(tmp_path):
+    """Small chunks + several workers still deliver each row once, formatted like the file."""
+    csv_path = write_csv(tmp_path / "trans.csv", rows=95, sep=",")
+    client = CapturingClient()
+
+    stats = load_csv_to_snowflake(client, csv_path, "TRANS", batch_size=10, chunk_rows=20,
+                                  queue_depth=2, upload_workers=3, use_cache=False)
+
+    assert stats["rows"] == 95
+    assert sorted(int(r[0]) for r in client.rows) == list(range(95))
+    # Same text in every chunk ("1001", never "1001.0"), blanks become NULL
+    accounts = {int(r[0]): r[1] for r in client.rows}
+    assert accounts[1] == "1001" and accounts[94] == "1094"
+    assert accounts[4] is None
+
+
+def test_uploads_overlap(tmp_path):
+    """With 4 upload workers, 20 round trips take well under 20x the latency."""
+    csv_path = write_csv(tmp_path / "trans.csv", rows=200)
+    client = RecordingClient(latency_sec=0.05)
+
+    start = time.perf_counter()
+    load_csv_to_snowflake(client, csv_path, "TRANS", batch_size=10, upload_workers=4,
+                          cache_dir=tmp_path / "cache")
+    elapsed = time.perf_counter() - start
+
+    assert client.rows_received == 200
+    assert elapsed < 20 * 0.05 * 0.6
+
+
+def test_failed_upload_stops_the_load(tmp_path):
+    """An upload error is raised to the caller, and the producer doesn't hang on a full queue."""
+    client = RecordingClient()
+
+    def broken_cursor():
+        cursor = RecordingClient.cursor(client)
+        cursor.executemany = lambda sql, rows: (_ for _ in ()).throw(RuntimeError("network down"))
+        return cursor
+
+    client.cursor = broken_cursor
+    chunks = (pd.DataFrame({"A": [str(i)] * 100}) for i in range(50))
+
+    with pytest.raises(RuntimeError, match="network down"):
+        pipelined_insert(client, "T", ["A"], chunks, batch_size=10, queue_depth=1, upload_workers=2)
+
+
+def test_read_csv_chunks_detects_separator(tmp_path):
+    csv_path = write_csv(tmp_path / "trans.csv", rows=5, sep=",")
+    chunks = list(read_csv_chunks(csv_path, chunk_rows=2))
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    assert list(chunks[0].columns) == ["TRANS_ID", "ACCOUNT", "AMOUNT"]
+
+
+def test_sort_chunks_orders_numerically_across_chunks(tmp_path):
+    """Rows from every chunk are sorted by date, then account — as numbers, not text — via month buckets on disk."""
+    chunks = [
+        pd.DataFrame({"DATE": ["930205", "930101", ""], "ACCOUNT_ID": ["10", "9", "1"], "AMOUNT": ["1", "2", "5"]}),
+        pd.DataFrame({"DATE": ["930101", "930102"], "ACCOUNT_ID": ["100", "2"], "AMOUNT": ["3", "4"]}),
+    ]
+
+    out = list(sort_chunks(chunks, ["DATE", "ACCOUNT_ID"], chunk_rows=2, spill_dir=tmp_path))
+
+    # One bucket per month (Jan, Feb) plus one for the unparseable date; each is re-chunked
+    assert [len(c) for c in out] == [2, 1, 1, 1]
+    merged = pd.concat(out)
+    assert list(merged["AMOUNT"]) == ["2", "3", "4", "1", "5"]
+    assert list(tmp_path.iterdir()) == []  # spilled buckets are cleaned up
+    with pytest.raises(ValueError, match="NOPE"):
+        list(sort_chunks(chunks, ["NOPE"]))
+
+
+def test_sorted_rows_are_cached(tmp_path, monkeypatch):
+    """The cache holds the sorted rows, so a second load neither parses nor sorts."""
+    csv_path = write_csv(tmp_path / "trans.csv", rows=30)
+    sorts = []
+    monkeypatch.setattr("src.load.load_raw.sort_chunks",
+                        lambda chunks, *args, **kwargs: sorts.append(1) or sort_chunks(chunks, *args, **kwargs))
+
+    loads = []
+    for _ in range(2):
+        client = CapturingClient()
+        load_csv_to_snowflake(client, csv_path, "TRANS", upload_workers=1,
+                              cache_dir=tmp_path / "cache", sort_by=["ACCOUNT", "TRANS_ID"])
+        loads.append([r[0] for r in client.rows])
+
+    assert len(sorts) == 1
+    assert loads[0] == loads[1]
+    assert loads[0][:3] == ["1", "2", "3"] and loads[0][-1] == "28"  # blank accounts sort last
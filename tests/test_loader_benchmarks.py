@@ -0,0 +1,67 @@
+"""
+test_loader_benchmarks.py — Tests for the offline loader benchmark and its stand-in client.
+
+HIGH-LEVEL EXPLANATION:
+    The loader benchmark only means something if the RecordingClient behaves
+    like a real connection from the loader's point of view. These tests run
+    the real loader against it on a tiny CSV and check what it recorded.
+"""
+
+from src.load.load_raw import load_csv_to_snowflake
+from src.perf.loader_benchmarks import benchmark_file, read_csv_strings
+from src.perf.recording_client import RecordingClient
+
+
+def write_sample_csv(path, rows=25):
+    """Write a small ';' separated CSV shaped like trans.csv."""
+    lines = ['"trans_id";"account_id";"amount";"k_symbol"']
+    lines += [f'{i};{i % 3};{i * 1.5};"{"SIPO" if i % 2 else ""}"' for i in range(1, rows + 1)]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def test_loader_against_recording_client(tmp_path):
+    """The loader should TRUNCATE once, then send one executemany per batch."""
+    csv_path = write_sample_csv(tmp_path / "trans.csv", rows=25)
+    client = RecordingClient()
+
+    load_csv_to_snowflake(client, csv_path, "TRANS", batch_size=10, cache_dir=tmp_path / "cache")
+
+    assert client.statements[0] == 'TRUNCATE TABLE FINFLOW.RAW."TRANS"'
+    inserts = [s for s in client.statements if s.startswith("INSERT")]
+    assert len(inserts) == 3
+    assert client.rows_received == 25
+
+
+def test_recording_client_returns_canned_responses():
+    """Statements matching a configured fragment get the canned rows back."""
+    client = RecordingClient(responses={"CURRENT_WAREHOUSE": [("FINFLOW_XS",)]})
+    assert client.execute("SELECT CURRENT_WAREHOUSE()") == [("FINFLOW_XS",)]
+    assert client.execute("SELECT 1") == []
+    assert client.round_trips == 2
+
+
+def test_benchmark_file_reports_every_stage(tmp_path):
+    """Each stage is reported once, and upload / pipelined once per batch size."""
+    csv_path = write_sample_csv(tmp_path / "trans.csv", rows=50)
+
+    results = benchmark_file(csv_path, batch_sizes=(10, 25), latency_sec=0.0)
+
+    stages = [(r["stage"], r["batch_size"]) for r in results]
+    assert stages == [
+        ("parse", None), ("cache_read", None), ("nan_replace", None), ("stringify", None), ("tuples", None),
+        ("upload", 10), ("upload", 25), ("pipelined", 10), ("pipelined", 25),
+    ]
+    assert all(r["rows"] == 50 for r in results)
+    assert results[0]["peak_mb"] is not None
+
+
+def test_parse_stage_reads_strings_like_the_loader(tmp_path):
+    """The benchmark parses with read_csv_chunks, so later stages see string columns, not inferred types."""
+    csv_path = write_sample_csv(tmp_path / "trans.csv", rows=5)
+
+    df = read_csv_strings(csv_path)
+
+    assert list(df.columns) == ["TRANS_ID", "ACCOUNT_ID", "AMOUNT", "K_SYMBOL"]
+    assert df["TRANS_ID"].tolist() == ["1", "2", "3", "4", "5"]
+    assert df["AMOUNT"].iloc[0] == "1.5"
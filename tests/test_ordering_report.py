@@ -0,0 +1,37 @@
+"""
+test_ordering_report.py — Tests for the natural-ordering vs clustering-key report.
+
+HIGH-LEVEL EXPLANATION:
+    The report swaps clones in and out of the real table name. We run it
+    against a RecordingClient and check every swap is undone, both clones are
+    dropped, and the report lists all three layouts.
+"""
+
+import json
+
+from src.perf.ordering_report import run_ordering_report
+from src.perf.recording_client import RecordingClient
+
+
+def test_report_restores_table_and_cleans_up(tmp_path):
+    info = json.dumps({"average_depth": 1.2, "average_overlaps": 0.5, "total_partition_count": 30})
+    client = RecordingClient(responses={
+        "SYSTEM$CLUSTERING_INFORMATION": [(info,)],
+        "INFORMATION_SCHEMA.TABLES": [(None,)],
+        "AUTOMATIC_CLUSTERING_HISTORY": [(0.25,)],
+    })
+    report = tmp_path / "ordering.md"
+
+    rows = run_ordering_report(client, runs=1, report_path=report)
+
+    table = "FINFLOW.ANALYTICS.FCT_TRANSACTIONS"
+    swaps = [s for s in client.statements if "SWAP WITH" in s]
+    assert swaps == [f"ALTER TABLE {table} SWAP WITH {table}__UNORDERED"] * 2 + \
+                    [f"ALTER TABLE {table} SWAP WITH {table}__CK"] * 2
+    assert f"DROP TABLE IF EXISTS {table}__CK" in client.statements
+    assert f"DROP TABLE IF EXISTS {table}__UNORDERED" in client.statements
+    assert client.statements[-1] == "ALTER SESSION UNSET USE_CACHED_RESULT"
+
+    assert [r["layout"] for r in rows][:2] == ["natural (ORDER BY at load)", "unordered"]
+    assert rows[2]["credits"] == 0.25
+    assert "natural (ORDER BY at load)" in report.read_text()
@@ -11,6 +11,7 @@ HIGH-LEVEL EXPLANATION:
 """
 
 from unittest.mock import MagicMock, patch
+from src.config import SQL_DIR
 from src.load.snowflake_client import SnowflakeClient
 
 
@@ -58,3 +59,20 @@ def test_client_execute_returns_results():
 
         mock_cursor.execute.assert_called_once_with("SELECT 1", None)
         assert len(results) == 2
+
+
+def test_every_sql_file_splits_into_valid_statements():
+    """execute_file splits on ';' — a semicolon inside a comment would break a statement in two."""
+    keywords = {"ALTER", "BEGIN", "COMMIT", "CREATE", "DELETE", "DROP", "GRANT", "INSERT",
+                "MERGE", "SELECT", "TRUNCATE", "UPDATE", "USE", "WITH"}
+
+    for sql_file in sorted(SQL_DIR.glob("*.sql")):
+        client = SnowflakeClient({})
+        client.execute = MagicMock()
+        client.execute_file(sql_file)
+
+        for call in client.execute.call_args_list:
+            statement = call.args[0]
+            code = [line for line in statement.splitlines() if not line.strip().startswith("--")]
+            first_word = " ".join(code).split()[0].upper() if code else ""
+            assert first_word in keywords, f"{sql_file.name}: bad statement {statement!r}"
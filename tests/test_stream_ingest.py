@@ -0,0 +1,167 @@
+"""
+test_stream_ingest.py — Tests for micro-batch streaming ingestion.
+
+HIGH-LEVEL EXPLANATION:
+    We drop small CSV and JSON-lines files into a temporary landing folder,
+    run the ingestor against a RecordingClient, and check that files are
+    coalesced into batches, committed as one transaction, archived, and that
+    backpressure stops discovery when too many rows are pending.
+"""
+
+import json
+
+from src.load.stream_ingest import StreamIngestor, read_trans_file
+from src.perf.recording_client import RecordingClient
+
+HEADER = '"trans_id";"account_id";"date";"type";"operation";"amount";"balance";"k_symbol";"bank";"account"'
+
+
+def write_csv(path, first_id, rows):
+    lines = [HEADER] + [
+        f'{i};{i % 5};970101;"PRIJEM";"VKLAD";100.0;500.0;"";"";' for i in range(first_id, first_id + rows)
+    ]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def make_ingestor(client, landing, **kwargs):
+    defaults = dict(max_batch_rows=100, max_wait_sec=0, poll_sec=0, settle_sec=0)
+    defaults.update(kwargs)
+    return StreamIngestor(client, landing, **defaults)
+
+
+def test_read_trans_file_handles_jsonl_with_missing_columns(tmp_path):
+    """JSON-lines feeds are read into RAW.TRANS columns; absent ones become NULL."""
+    path = tmp_path / "trans_feed.jsonl"
+    path.write_text(json.dumps({"trans_id": 9, "account_id": 2, "date": 980101, "amount": 12.5}) + "\n")
+
+    df = read_trans_file(path)
+
+    assert list(df.columns)[:3] == ["TRANS_ID", "ACCOUNT_ID", "DATE"]
+    assert df.iloc[0]["TRANS_ID"] == "9"
+    assert df.iloc[0]["BANK"] is None
+
+
+def test_read_trans_file_keeps_values_as_written(tmp_path):
+    """IDs with gaps stay "9", not "9.0", and blanks become NULL, not the string "nan"."""
+    csv_path = tmp_path / "trans_1.csv"
+    write_csv(csv_path, 9, 2)
+    jsonl_path = tmp_path / "trans_2.jsonl"
+    jsonl_path.write_text(
+        json.dumps({"trans_id": 9, "account_id": 2, "date": 980101, "account": 38065709, "amount": 12.5}) + "\n"
+        + json.dumps({"trans_id": 10, "account_id": 2, "date": 980102, "amount": 1}) + "\n"
+    )
+
+    from_csv = read_trans_file(csv_path)
+    from_jsonl = read_trans_file(jsonl_path)
+
+    assert list(from_csv["TRANS_ID"]) == ["9", "10"]
+    assert from_csv.iloc[0]["ACCOUNT"] is None and from_csv.iloc[0]["AMOUNT"] == "100.0"
+    assert list(from_jsonl["ACCOUNT"]) == ["38065709", None]
+    assert list(from_jsonl["AMOUNT"]) == ["12.5", "1"]
+
+
+def test_small_files_are_coalesced_into_one_transactional_batch(tmp_path):
+    """Three small files become one batch, merged inside BEGIN/COMMIT, then archived."""
+    for n in range(3):
+        write_csv(tmp_path / f"trans_{n}.csv", n * 10 + 1, 10)
+    client = RecordingClient()
+    seen_accounts = []
+    ingestor = make_ingestor(client, tmp_path, on_batch=seen_accounts.extend)
+
+    ingestor.run(max_batches=1)
+
+    assert ingestor.total_rows == 30 and ingestor.batches == 1
+    assert client.rows_received == 30
+    begin = client.statements.index("BEGIN")
+    assert "MERGE INTO FINFLOW.RAW.TRANS t" in client.statements[begin + 1]
+    assert client.statements[-1] == "COMMIT"
+    assert sorted(p.name for p in (tmp_path / "processed").iterdir()) == [
+        "trans_0.csv", "trans_1.csv", "trans_2.csv",
+    ]
+    assert seen_accounts == [0, 1, 2, 3, 4]
+
+
+def test_same_trans_id_in_two_files_of_one_batch_is_merged_once(tmp_path):
+    """A file re-delivered within one batch stages both copies, so every MERGE source must dedupe its key."""
+    write_csv(tmp_path / "trans_0.csv", 1, 10)
+    write_csv(tmp_path / "trans_0_redelivered.csv", 1, 10)
+    client = RecordingClient()
+
+    make_ingestor(client, tmp_path).run(max_batches=1)
+
+    assert client.rows_received == 20  # both copies reach TRANS_INCOMING in the same batch
+    def merge_into(target):
+        return next(s for s in client.statements if f"MERGE INTO FINFLOW.{target}" in s)
+
+    # Both keep the latest delivery (highest LOAD_SEQ), and both upsert, so RAW and FCT agree
+    assert "PARTITION BY TRANS_ID ORDER BY LOAD_SEQ DESC) = 1" in merge_into("RAW.TRANS t")
+    assert "PARTITION BY TRANSACTION_KEY ORDER BY i.LOAD_SEQ DESC) = 1" in merge_into("ANALYTICS.FCT_TRANSACTIONS f")
+    assert "WHEN MATCHED THEN UPDATE" in merge_into("RAW.TRANS t")
+    assert "WHEN MATCHED THEN UPDATE" in merge_into("ANALYTICS.FCT_TRANSACTIONS f")
+    assert any("TRANS_INCOMING" in s and "LOAD_SEQ) VALUES" in s for s in client.statements)
+    assert "SELECT DISTINCT" in merge_into("ANALYTICS.DIM_DATE d")
+
+
+def test_backpressure_leaves_files_on_disk(tmp_path):
+    """Past max_pending_rows, new files stay in the landing dir until the backlog drains."""
+    for n in range(4):
+        write_csv(tmp_path / f"trans_{n}.csv", n * 10 + 1, 10)
+    ingestor = make_ingestor(RecordingClient(), tmp_path, max_batch_rows=20,
+                             max_pending_rows=20, max_wait_sec=3600)
+
+    ingestor.discover()
+    assert ingestor.pending_rows == 20
+    assert ingestor.backpressure and ingestor.should_flush()
+
+    ingestor.run(idle_exit_sec=0)
+    assert ingestor.total_rows == 40
+    assert ingestor.batches == 2
+
+
+def test_unreadable_file_goes_to_failed(tmp_path):
+    """A file without TRANS_ID is moved aside and the stream keeps going."""
+    (tmp_path / "trans_bad.csv").write_text("foo;bar\n1;2\n")
+    ingestor = make_ingestor(RecordingClient(), tmp_path)
+
+    ingestor.discover()
+
+    assert ingestor.pending == []
+    assert (tmp_path / "failed" / "trans_bad.csv").exists()
+
+
+def test_row_without_a_date_sends_its_file_to_failed(tmp_path):
+    """A blank DATE would fail the FCT MERGE, so the file is rejected before it joins a batch."""
+    write_csv(tmp_path / "trans_0.csv", 1, 3)
+    (tmp_path / "trans_1.csv").write_text(HEADER + '\n7;1;;"PRIJEM";"VKLAD";1.0;1.0;"";"";\n')
+    ingestor = make_ingestor(RecordingClient(), tmp_path)
+
+    ingestor.run(idle_exit_sec=0)
+
+    assert ingestor.total_rows == 3
+    assert [p.name for p in (tmp_path / "failed").iterdir()] == ["trans_1.csv"]
+
+
+def test_failed_batch_is_retried_file_by_file_and_the_stream_keeps_going(tmp_path):
+    """One file the warehouse rejects goes to failed/; the files batched with it still load."""
+    for n in range(3):
+        write_csv(tmp_path / f"trans_{n}.csv", n * 10 + 1, 10)
+
+    class RejectingClient(RecordingClient):
+        def cursor(self):
+            cursor = super().cursor()
+            executemany = cursor.executemany
+
+            def reject_file_1(sql, rows):
+                if any(row[0] == "15" for row in rows):
+                    raise RuntimeError("rejected")
+                return executemany(sql, rows)
+
+            cursor.executemany = reject_file_1
+            return cursor
+
+    ingestor = make_ingestor(RejectingClient(), tmp_path)
+    ingestor.run(idle_exit_sec=0)
+
+    assert ingestor.total_rows == 20
+    assert sorted(p.name for p in (tmp_path / "processed").iterdir()) == ["trans_0.csv", "trans_2.csv"]
+    assert [p.name for p in (tmp_path / "failed").iterdir()] == ["trans_1.csv"]
@@ -0,0 +1,117 @@
+"""
+test_warehouse_manager.py — Tests for per-stage warehouse sizing and suspend.
+
+HIGH-LEVEL EXPLANATION:
+    We run fake pipeline stages against a RecordingClient and check exactly
+    which USE / ALTER WAREHOUSE statements were issued, in what order.
+"""
+
+from src.load.warehouse_manager import WarehouseManager, estimate_credits, normalize_size
+from src.perf.recording_client import RecordingClient
+
+
+def show_warehouses(*sizes):
+    """Canned SHOW WAREHOUSES results: (name, state, type, size, ...) per (name, size) pair."""
+    return {f"SHOW WAREHOUSES LIKE '{name}'": [(name, "SUSPENDED", "STANDARD", size)] for name, size in sizes}
+
+
+def test_stage_scales_up_then_down():
+    """A stage with size + scale_down should resize before and after its body."""
+    client = RecordingClient(responses=show_warehouses(("FINFLOW_XS", "X-Small")))
+    profiles = {"transform": {"warehouse": None, "size": "MEDIUM", "scale_down": "XSMALL"}}
+    warehouses = WarehouseManager(client, "FINFLOW_XS", profiles)
+
+    with warehouses.stage("transform"):
+        client.execute("INSERT INTO FCT_TRANSACTIONS SELECT 1")
+
+    assert client.statements == [
+        "SHOW WAREHOUSES LIKE 'FINFLOW_XS'",
+        "ALTER WAREHOUSE FINFLOW_XS SET WAREHOUSE_SIZE = 'MEDIUM' WAIT_FOR_COMPLETION = TRUE",
+        "INSERT INTO FCT_TRANSACTIONS SELECT 1",
+        "ALTER WAREHOUSE FINFLOW_XS SET WAREHOUSE_SIZE = 'XSMALL' WAIT_FOR_COMPLETION = TRUE",
+    ]
+    assert warehouses.stage_results[0]["size"] == "MEDIUM"
+
+
+def test_existing_size_is_restored_by_default():
+    """Without scale_down, a LARGE warehouse scaled to MEDIUM goes back to LARGE, not XSMALL."""
+    client = RecordingClient(responses=show_warehouses(("FINFLOW_WH", "Large")))
+    profiles = {"transform": {"warehouse": None, "size": "MEDIUM", "scale_down": None}}
+    warehouses = WarehouseManager(client, "FINFLOW_WH", profiles)
+
+    with warehouses.stage("transform"):
+        pass
+    with warehouses.stage("transform"):
+        pass
+
+    resizes = [s for s in client.statements if "SET WAREHOUSE_SIZE" in s]
+    assert resizes == [
+        "ALTER WAREHOUSE FINFLOW_WH SET WAREHOUSE_SIZE = 'MEDIUM' WAIT_FOR_COMPLETION = TRUE",
+        "ALTER WAREHOUSE FINFLOW_WH SET WAREHOUSE_SIZE = 'LARGE' WAIT_FOR_COMPLETION = TRUE",
+    ] * 2
+    assert client.statements.count("SHOW WAREHOUSES LIKE 'FINFLOW_WH'") == 1
+
+
+def test_unknown_size_is_not_restored_to_a_guess():
+    """If SHOW WAREHOUSES returns nothing, the warehouse isn't "restored" to an assumed XSMALL."""
+    client = RecordingClient()
+    profiles = {"transform": {"warehouse": None, "size": "MEDIUM", "scale_down": None}}
+    warehouses = WarehouseManager(client, "FINFLOW_WH", profiles)
+
+    with warehouses.stage("transform"):
+        pass
+
+    assert [s for s in client.statements if "SET WAREHOUSE_SIZE" in s] == [
+        "ALTER WAREHOUSE FINFLOW_WH SET WAREHOUSE_SIZE = 'MEDIUM' WAIT_FOR_COMPLETION = TRUE",
+    ]
+
+
+def test_no_alter_when_size_is_unchanged():
+    """Stages without a profile, or already at the right size, issue no ALTERs."""
+    client = RecordingClient(responses=show_warehouses(("FINFLOW_XS", "X-Small")))
+    profiles = {"load": {"warehouse": None, "size": "XSMALL", "scale_down": None}}
+    warehouses = WarehouseManager(client, "FINFLOW_XS", profiles)
+
+    with warehouses.stage("load"):
+        pass
+    with warehouses.stage("quality"):
+        pass
+
+    assert client.statements == ["SHOW WAREHOUSES LIKE 'FINFLOW_XS'"]
+
+
+def test_separate_warehouse_and_suspend_all():
+    """A stage on its own warehouse switches to it, is billed at its real size, and both get suspended."""
+    client = RecordingClient(responses=show_warehouses(("FINFLOW_M", "Medium"), ("FINFLOW_XS", "X-Small")))
+    profiles = {"transform": {"warehouse": "FINFLOW_M", "size": None, "scale_down": None}}
+    warehouses = WarehouseManager(client, "FINFLOW_XS", profiles)
+
+    with warehouses.stage("transform"):
+        pass
+    with warehouses.stage("quality"):
+        pass
+    warehouses.suspend_all()
+
+    assert client.statements == [
+        "USE WAREHOUSE FINFLOW_M",
+        "SHOW WAREHOUSES LIKE 'FINFLOW_M'",
+        "USE WAREHOUSE FINFLOW_XS",
+        "SHOW WAREHOUSES LIKE 'FINFLOW_XS'",
+        "ALTER WAREHOUSE FINFLOW_XS SUSPEND",
+        "ALTER WAREHOUSE FINFLOW_M SUSPEND",
+    ]
+    assert [r["size"] for r in warehouses.stage_results] == ["MEDIUM", "XSMALL"]
+
+
+def test_normalize_size():
+    """SHOW WAREHOUSES prints "X-Small" / "2X-Large"; ALTER wants XSMALL / XXLARGE."""
+    assert normalize_size("X-Small") == "XSMALL"
+    assert normalize_size("Medium") == "MEDIUM"
+    assert normalize_size("2X-Large") == "XXLARGE"
+    assert normalize_size("4X-Large") == "X4LARGE"
+
+
+def test_estimate_credits():
+    """One hour on MEDIUM costs 4 credits; one minute on XSMALL costs 1/60."""
+    assert estimate_credits("MEDIUM", 3600) == 4
+    assert abs(estimate_credits("XSMALL", 60) - 1 / 60) < 1e-9